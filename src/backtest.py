@@ -0,0 +1,151 @@
+import argparse
+import dataclasses
+import datetime
+import itertools
+import pathlib
+import tempfile
+import time
+
+import orjson
+
+from core.backtest import Market, Variant, run_many
+from core.data import Config
+from core.history import price_history
+
+
+def main(
+    start: datetime.datetime,
+    end: datetime.datetime,
+    step: datetime.timedelta,
+    variants: list[Variant],
+    processes: int | None = None,
+    output: pathlib.Path | None = None,
+) -> None:
+    started_at = time.perf_counter()
+    market = Market.from_history(price_history, start, end, step)
+    print(
+        f"Loaded {len(market.timestamps)} snapshots x "
+        f"{market.prices.shape[1]} coins "
+        f"in {time.perf_counter() - started_at:.2f}s"
+    )
+
+    with tempfile.TemporaryDirectory() as path:
+        market.save(pathlib.Path(path))
+        del market
+
+        started_at = time.perf_counter()
+        results = run_many(pathlib.Path(path), variants, processes)
+        print(
+            f"Ran {len(results)} variants "
+            f"in {time.perf_counter() - started_at:.2f}s"
+        )
+
+    results.sort(key=(lambda k: k.pnl_percentage), reverse=True)
+
+    if output is not None:
+        output.write_bytes(
+            orjson.dumps(
+                [dataclasses.asdict(result) for result in results],
+                option=(orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY),
+            )
+        )
+
+    print(
+        f"{'amount':>10} {'min mcap':>14} {'delay':>6} {'rebalance':>9} "
+        f"{'coins':>6} {'invested':>14} {'value':>14} {'pnl %':>9} "
+        f"{'max dd %':>9} {'sharpe':>7}"
+    )
+
+    for result in results:
+        print(
+            f"{result.variant.buy_amount:>10,.2f} "
+            f"{result.variant.min_mcap:>14,.0f} "
+            f"{result.variant.entry_delay:>6} "
+            f"{result.variant.rebalance:>9} "
+            f"{result.coins:>6} "
+            f"{result.quote_value_invested:>14,.2f} "
+            f"{result.quote_value:>14,.2f} "
+            f"{result.pnl_percentage:>+9.2f} "
+            f"{result.max_drawdown * 100:>9.2f} "
+            f"{result.sharpe:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backtest buy-every-coin variants on recorded history"
+    )
+    parser.add_argument(
+        "--start",
+        type=datetime.datetime.fromisoformat,
+        required=True,
+        help="first snapshot to replay (ISO date or datetime)",
+    )
+    parser.add_argument(
+        "--end",
+        type=datetime.datetime.fromisoformat,
+        default=datetime.datetime.now(),
+        help="replay snapshots up to this moment (default: now)",
+    )
+    parser.add_argument(
+        "--step",
+        type=(lambda k: datetime.timedelta(minutes=int(k))),
+        default=datetime.timedelta(hours=1),
+        help="minutes between replayed snapshots (default: 60)",
+    )
+    parser.add_argument(
+        "--buy-amount",
+        type=float,
+        nargs="+",
+        default=[Config.buy_amount.to_float()],
+    )
+    parser.add_argument(
+        "--min-mcap",
+        type=float,
+        nargs="+",
+        default=[Config.min_mcap.to_float()],
+    )
+    parser.add_argument(
+        "--entry-delay",
+        type=int,
+        nargs="+",
+        default=[0],
+        help="steps to wait after a coin qualifies before buying it",
+    )
+    parser.add_argument(
+        "--rebalance",
+        type=int,
+        nargs="+",
+        default=[0],
+        help="steps between equal-weight rebalances (0 never rebalances)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="worker processes (default: one per core)",
+    )
+    parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=None,
+        help="write the results as JSON",
+    )
+    args = parser.parse_args()
+
+    main(
+        start=args.start,
+        end=args.end,
+        step=args.step,
+        variants=[
+            Variant(*variant)
+            for variant in itertools.product(
+                args.buy_amount,
+                args.min_mcap,
+                args.entry_delay,
+                args.rebalance,
+            )
+        ],
+        processes=args.processes,
+        output=args.output,
+    )
@@ -0,0 +1,126 @@
+import argparse
+import pathlib
+import statistics
+import time
+from typing import Callable
+
+import orjson
+
+from benchmarks.markets import generate_markets_page
+from core.coingecko import decode_markets, sqlite_now
+
+try:
+    from ciso8601 import parse_datetime
+except ImportError:
+    import datetime
+
+    parse_datetime = datetime.datetime.fromisoformat
+
+
+def decode_legacy(body: bytes) -> list[dict]:
+    return [
+        {
+            "id": coin_market.get("id"),
+            "symbol": coin_market.get("symbol"),
+            "current_price": coin_market.get("current_price", 0.00),
+            "market_cap": coin_market.get("market_cap", 0.00),
+            "price_change_24h": coin_market.get("price_change_24h", 0.00),
+            "price_change_percentage_24h": coin_market.get(
+                "price_change_percentage_24h",
+                0.00,
+            ),
+            "market_cap_change_24h": coin_market.get(
+                "market_cap_change_24h",
+                0.00,
+            ),
+            "market_cap_change_percentage_24h": coin_market.get(
+                "market_cap_change_percentage_24h",
+                0.00,
+            ),
+            "ath": coin_market.get("ath", 0.00),
+            "ath_change_percentage": coin_market.get(
+                "ath_change_percentage",
+                0.00,
+            ),
+            "ath_date": parse_datetime(
+                coin_market.get("ath_date", "2024-01-01T00:00:00Z"),
+            ),
+            "atl": coin_market.get("atl", 0.00),
+            "atl_change_percentage": coin_market.get(
+                "atl_change_percentage",
+                0.00,
+            ),
+            "atl_date": parse_datetime(
+                coin_market.get("atl_date", "2024-01-01T00:00:00Z"),
+            ),
+        }
+        for coin_market in orjson.loads(body)
+    ]
+
+
+def decode_typed(body: bytes) -> list[tuple]:
+    now = sqlite_now()
+
+    return [coin_market.to_row(now) for coin_market in decode_markets(body)]
+
+
+def measure(
+    func: Callable[[bytes], list],
+    body: bytes,
+    number: int,
+    repeat: int,
+) -> list[float]:
+    timings = []
+
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+
+        for _ in range(number):
+            func(body)
+
+        timings.append((time.perf_counter() - start_time) / number)
+
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare /coins/markets page decoding paths",
+    )
+    parser.add_argument(
+        "--page",
+        type=pathlib.Path,
+        default=None,
+        help="recorded /coins/markets response (synthetic if omitted)",
+    )
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    body = (
+        args.page.read_bytes()
+        if args.page is not None
+        else orjson.dumps(generate_markets_page())
+    )
+    coins = len(orjson.loads(body))
+    results = {
+        "legacy": measure(decode_legacy, body, args.number, args.repeat),
+        "typed": measure(decode_typed, body, args.number, args.repeat),
+    }
+
+    print(f"page: {coins} coins, {len(body) / 1024:,.1f} KiB")
+
+    for name, timings in results.items():
+        print(
+            f"{name:>8}: {min(timings) * 1e6:,.1f} us/page best,"
+            f" {statistics.median(timings) * 1e6:,.1f} us/page median,"
+            f" {min(timings) / coins * 1e9:,.0f} ns/coin"
+        )
+
+    print(
+        f"speedup: {min(results['legacy']) / min(results['typed']):.2f}x",
+    )
+
+
+if __name__ == "__main__":
+    main()
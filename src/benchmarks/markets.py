@@ -0,0 +1,56 @@
+import datetime
+import random
+
+
+def generate_market_coin(rank: int, rng: random.Random) -> dict:
+    current_price = rng.lognormvariate(0.00, 3.00)
+    circulating_supply = rng.uniform(1e6, 1e10)
+    market_cap = int(1e12 / rank**1.5 * rng.uniform(0.90, 1.10))
+    ath = current_price * rng.uniform(1.00, 50.00)
+    atl = current_price / rng.uniform(1.00, 50.00)
+    ath_date = datetime.datetime(2021, 1, 1) + datetime.timedelta(
+        seconds=rng.randrange(100_000_000)
+    )
+    atl_date = ath_date - datetime.timedelta(seconds=rng.randrange(50_000_000))
+
+    return {
+        "id": f"coin-{rank}",
+        "symbol": f"c{rank}",
+        "name": f"Coin {rank}",
+        "image": f"https://assets.coingecko.com/coins/images/{rank}/large/c.png",
+        "current_price": current_price,
+        "market_cap": market_cap,
+        "market_cap_rank": rank,
+        "fully_diluted_valuation": market_cap * 2,
+        "total_volume": market_cap * rng.uniform(0.01, 0.30),
+        "high_24h": current_price * 1.05,
+        "low_24h": current_price * 0.95,
+        "price_change_24h": current_price * rng.uniform(-0.10, 0.10),
+        "price_change_percentage_24h": rng.uniform(-10.00, 10.00),
+        "market_cap_change_24h": market_cap * rng.uniform(-0.10, 0.10),
+        "market_cap_change_percentage_24h": rng.uniform(-10.00, 10.00),
+        "circulating_supply": circulating_supply,
+        "total_supply": circulating_supply * 1.5,
+        "max_supply": None if rank % 3 else circulating_supply * 2,
+        "ath": ath,
+        "ath_change_percentage": (current_price - ath) / ath * 100,
+        "ath_date": ath_date.isoformat(timespec="milliseconds") + "Z",
+        "atl": atl,
+        "atl_change_percentage": (current_price - atl) / atl * 100,
+        "atl_date": atl_date.isoformat(timespec="milliseconds") + "Z",
+        "roi": None,
+        "last_updated": "2024-06-01T12:00:00.000Z",
+    }
+
+
+def generate_markets_page(
+    page: int = 1,
+    per_page: int = 250,
+    seed: int = 0,
+) -> list[dict]:
+    rng = random.Random(seed * 1_000_003 + page)
+
+    return [
+        generate_market_coin(rank, rng)
+        for rank in range((page - 1) * per_page + 1, page * per_page + 1)
+    ]
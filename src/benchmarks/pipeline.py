@@ -0,0 +1,222 @@
+import argparse
+import datetime
+import os
+import pathlib
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+
+import orjson
+
+SCENARIOS = (
+    "1000x1",
+    "10000x1",
+    "50000x1",
+    "1000x100",
+    "10000x100",
+    "1000x1000",
+)
+SRC_PATH = pathlib.Path(__file__).resolve().parents[1]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+
+        return sock.getsockname()[1]
+
+
+def run_scenario(scenario: str, repeat: int, seed: int = 0) -> dict:
+    port = free_port()
+    env = os.environ | {
+        "PYTHONPATH": str(SRC_PATH),
+        "DATABASE_PATH": "benchmark.db",
+        "DATABASE_HISTORY_PATH": "history",
+        "CONFIG_PORTFOLIO_ID": "",
+        "CONFIG_CURRENCY": "usd",
+        "CONFIG_BUY_AMOUNT": "100",
+        "CONFIG_MIN_MCAP": "1",
+        "COINGECKO_API_KEY": "benchmark",
+        "COINGECKO_BASE_URL": f"http://127.0.0.1:{port}/",
+        "COINGECKO_RECORD_PATH": "",
+        "COINGECKO_REQUESTS_PER_MINUTE": "1000000",
+        "TELEGRAM_BOT_TOKEN": "1:benchmark",
+        "TELEGRAM_CHANNEL_ID": "-1",
+        "TELEGRAM_CHANNEL_MESSAGE_ID": "1",
+        "TELEGRAM_TARGETS": "",
+        "TELEGRAM_REQUESTS_PER_SECOND": "1000000",
+    }
+
+    with tempfile.TemporaryDirectory() as path:
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.stages",
+                scenario,
+                f"--repeat={repeat}",
+                f"--port={port}",
+                f"--seed={seed}",
+            ],
+            cwd=path,
+            env=env,
+            capture_output=True,
+        )
+
+    if process.returncode != 0:
+        sys.stderr.write(process.stderr.decode())
+        raise RuntimeError(f"scenario {scenario} failed")
+
+    return orjson.loads(process.stdout.splitlines()[-1])
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    threshold: float = 0.20,
+    min_delta: float = 0.005,
+) -> list[dict]:
+    comparisons = []
+
+    for scenario, scenario_results in results["scenarios"].items():
+        baseline_scenario = baseline["scenarios"].get(scenario)
+
+        if baseline_scenario is None:
+            continue
+
+        for stage, stage_results in scenario_results["stages"].items():
+            baseline_stage = baseline_scenario["stages"].get(stage)
+
+            if baseline_stage is None:
+                continue
+
+            ratio = stage_results["p50"] / baseline_stage["p50"]
+            comparisons.append(
+                {
+                    "scenario": scenario,
+                    "stage": stage,
+                    "baseline_p50": baseline_stage["p50"],
+                    "p50": stage_results["p50"],
+                    "ratio": ratio,
+                    "regression": (
+                        ratio > 1 + threshold
+                        and stage_results["p50"] - baseline_stage["p50"]
+                        > min_delta
+                    ),
+                }
+            )
+
+    return comparisons
+
+
+def main(
+    scenarios: list[str],
+    repeat: int,
+    output: pathlib.Path | None = None,
+    baseline: pathlib.Path | None = None,
+    threshold: float = 0.20,
+) -> int:
+    results = {
+        "created_at": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "scenarios": {},
+    }
+
+    print(
+        f"{'scenario':>10} {'stage':>24} {'p50 ms':>10} {'p99 ms':>10} "
+        f"{'ops/s':>9} {'items/s':>12}"
+    )
+
+    for scenario in scenarios:
+        scenario_results = results["scenarios"][scenario] = run_scenario(
+            scenario,
+            repeat,
+        )
+
+        for stage, stage_results in scenario_results["stages"].items():
+            print(
+                f"{scenario:>10} {stage:>24} "
+                f"{stage_results['p50'] * 1000:>10.2f} "
+                f"{stage_results['p99'] * 1000:>10.2f} "
+                f"{stage_results['ops_per_sec']:>9.2f} "
+                f"{stage_results['items_per_sec']:>12,.0f}"
+            )
+
+        print(
+            f"{scenario:>10} {'peak RSS (scenario)':>24} "
+            f"{scenario_results['peak_rss_mb']:>10.1f} MB"
+        )
+
+    if output is not None:
+        output.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+
+    if baseline is None:
+        return 0
+
+    comparisons = compare(
+        results,
+        orjson.loads(baseline.read_bytes()),
+        threshold=threshold,
+    )
+
+    print(
+        f"\n{'scenario':>10} {'stage':>24} {'baseline ms':>12} "
+        f"{'p50 ms':>10} {'change':>8}"
+    )
+
+    for comparison in comparisons:
+        print(
+            f"{comparison['scenario']:>10} {comparison['stage']:>24} "
+            f"{comparison['baseline_p50'] * 1000:>12.2f} "
+            f"{comparison['p50'] * 1000:>10.2f} "
+            f"{(comparison['ratio'] - 1) * 100:>+7.1f}%"
+            + (" REGRESSION" if comparison["regression"] else "")
+        )
+
+    return int(any(comparison["regression"] for comparison in comparisons))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the tracker pipeline stage by stage"
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        default=None,
+        help=f"COINSxPORTFOLIOS, repeatable (default: {' '.join(SCENARIOS)})",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=None,
+        help="write the results as JSON",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=pathlib.Path,
+        default=None,
+        help="compare p50 timings against a saved --output file",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.20,
+        help="p50 slowdown counted as a regression (default: 0.20)",
+    )
+    args = parser.parse_args()
+
+    sys.exit(
+        main(
+            scenarios=(args.scenario or list(SCENARIOS)),
+            repeat=args.repeat,
+            output=args.output,
+            baseline=args.baseline,
+            threshold=args.threshold,
+        )
+    )
@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import math
+import pathlib
+import random
+import time
+
+import orjson
+from aiohttp import web
+
+from benchmarks.markets import generate_markets_page
+
+
+def load_sweeps(path: pathlib.Path) -> list[list[dict]]:
+    sweeps: list[dict[int, list[dict]]] = []
+
+    for record_path in sorted(path.glob("*-page-*.json")):
+        page = int(record_path.stem.rsplit("-", 1)[1])
+
+        if len(sweeps) == 0 or page in sweeps[-1]:
+            sweeps.append({})
+
+        sweeps[-1][page] = orjson.loads(record_path.read_bytes())
+
+    return [
+        list(
+            {
+                coin["id"]: coin
+                for page in sorted(sweep)
+                for coin in sweep[page]
+            }.values()
+        )
+        for sweep in sweeps
+    ]
+
+
+class Universe:
+    def __init__(
+        self,
+        sweeps: list[list[dict]],
+        tick: float = 60.00,
+        volatility: float = 0.00,
+        seed: int = 0,
+    ) -> None:
+        self.sweeps = sweeps
+        self.tick = tick
+        self.volatility = volatility
+        self.rng = random.Random(seed)
+        self.sweep = 0
+        self.ticks = 0
+        self.version = 0
+        self.started_at = time.monotonic()
+        self.coins = [dict(coin) for coin in sweeps[0]]
+        self.indices = {coin["id"]: i for i, coin in enumerate(self.coins)}
+        self._pages: dict[tuple[int, int], bytes] = {}
+
+    @classmethod
+    def synthesize(cls, coins: int, seed: int = 0, **kwargs) -> "Universe":
+        return cls(
+            [
+                [
+                    coin
+                    for page in range(1, coins // 250 + 2)
+                    for coin in generate_markets_page(page, 250, seed)
+                ][:coins]
+            ],
+            seed=seed,
+            **kwargs,
+        )
+
+    @classmethod
+    def replay(cls, path: pathlib.Path, **kwargs) -> "Universe":
+        return cls(load_sweeps(path), **kwargs)
+
+    def refresh(self) -> None:
+        ticks = int((time.monotonic() - self.started_at) / self.tick)
+
+        if ticks > self.ticks:
+            self.advance(ticks - self.ticks)
+            self.ticks = ticks
+
+    def advance(self, ticks: int = 1) -> None:
+        if len(self.sweeps) > 1:
+            self.sweep = (self.sweep + ticks) % len(self.sweeps)
+            self.coins = [dict(coin) for coin in self.sweeps[self.sweep]]
+
+        if self.volatility > 0:
+            deviation = self.volatility * math.sqrt(ticks)
+
+            for coin in self.coins:
+                change = math.exp(self.rng.gauss(0.00, deviation))
+                coin["current_price"] = (coin["current_price"] or 0) * change
+                coin["market_cap"] = int((coin["market_cap"] or 0) * change)
+
+            self.coins.sort(key=(lambda k: k["market_cap"]), reverse=True)
+
+            for rank, coin in enumerate(self.coins, start=1):
+                coin["market_cap_rank"] = rank
+
+        self.indices = {coin["id"]: i for i, coin in enumerate(self.coins)}
+        self.version += 1
+        self._pages.clear()
+
+    def list_coins(self, coins: int | None = None) -> None:
+        self.coins = [dict(coin) for coin in self.sweeps[self.sweep][:coins]]
+        self.indices = {coin["id"]: i for i, coin in enumerate(self.coins)}
+        self.version += 1
+        self._pages.clear()
+
+    def page(self, per_page: int, page: int) -> bytes:
+        key = (per_page, page)
+
+        if key not in self._pages:
+            self._pages[key] = orjson.dumps(
+                self.coins[(page - 1) * per_page : page * per_page]
+            )
+
+        return self._pages[key]
+
+    def select(self, ids: list[str]) -> bytes:
+        return orjson.dumps(
+            [self.coins[self.indices[id]] for id in ids if id in self.indices]
+        )
+
+
+def create_app(
+    universe: Universe,
+    latency: float = 0.00,
+    jitter: float = 0.00,
+    error_rate: float = 0.00,
+    retry_after: int = 1,
+    seed: int = 0,
+) -> web.Application:
+    rng = random.Random(seed)
+    stats = {"requests": 0, "throttled": 0}
+
+    async def markets(request: web.Request) -> web.Response:
+        stats["requests"] += 1
+
+        if latency > 0 or jitter > 0:
+            await asyncio.sleep(max(0.00, rng.gauss(latency, jitter)) / 1000)
+
+        if rng.random() < error_rate:
+            stats["throttled"] += 1
+            return web.Response(
+                status=429,
+                headers={"Retry-After": str(retry_after)},
+            )
+
+        universe.refresh()
+
+        if ids := request.query.get("ids"):
+            body = universe.select(ids.split(","))
+
+        else:
+            body = universe.page(
+                per_page=min(int(request.query.get("per_page", 100)), 250),
+                page=max(int(request.query.get("page", 1)), 1),
+            )
+
+        return web.Response(body=body, content_type="application/json")
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response(
+            stats
+            | {
+                "coins": len(universe.coins),
+                "version": universe.version,
+            }
+        )
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_get("/api/v3/coins/markets", markets)
+    app.router.add_get("/api/v3/coins/markets/", markets)
+    app.router.add_get("/stats", get_stats)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Local CoinGecko /coins/markets stand-in"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--replay",
+        type=pathlib.Path,
+        default=None,
+        help="serve responses recorded via COINGECKO_RECORD_PATH",
+    )
+    parser.add_argument(
+        "--coins",
+        type=int,
+        default=5000,
+        help="synthesized universe size (ignored with --replay)",
+    )
+    parser.add_argument(
+        "--tick",
+        type=float,
+        default=60.00,
+        help="seconds between market moves (next recorded sweep or step)",
+    )
+    parser.add_argument(
+        "--volatility",
+        type=float,
+        default=0.01,
+        help="per-tick log price deviation of the random walk (0 disables)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.00,
+        help="mean response latency (ms)",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.00,
+        help="latency standard deviation (ms)",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.00,
+        help="share of requests answered with 429",
+    )
+    parser.add_argument(
+        "--retry-after",
+        type=int,
+        default=1,
+        help="Retry-After seconds sent with injected 429s",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    universe_options = {"tick": args.tick, "volatility": args.volatility}
+    universe = (
+        Universe.replay(args.replay, seed=args.seed, **universe_options)
+        if args.replay is not None
+        else Universe.synthesize(args.coins, args.seed, **universe_options)
+    )
+
+    web.run_app(
+        create_app(
+            universe,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            retry_after=args.retry_after,
+            seed=args.seed,
+        ),
+        host=args.host,
+        port=args.port,
+    )
@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import resource
+import time
+from typing import Awaitable, Callable
+
+import numpy as np
+import orjson
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import GetChat
+from aiogram.types import Chat
+from aiohttp import web
+
+import prepare
+from benchmarks.server import Universe, create_app
+from core import coingecko
+from core import telegram as telegram_client
+from core.data import Telegram
+from core.database import Base, engine
+from core.report import get_targets
+from core.snapshot import market_snapshots
+from tasks import coins, portfolio, telegram
+
+STAGES = (
+    "prepare",
+    "update_market_data",
+    "add_new_coins",
+    "update_stats",
+    "update_channel_message",
+)
+
+
+class StubSession(BaseSession):
+    def __init__(self, latency: float = 0.00) -> None:
+        super().__init__()
+        self.latency = latency
+        self.requests = 0
+
+    async def close(self) -> None:
+        return None
+
+    async def make_request(self, bot, method, timeout=None):
+        self.requests += 1
+
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+        if isinstance(method, GetChat):
+            return Chat(id=method.chat_id, type="channel", username="bench")
+
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, **kwargs):
+        yield b""
+
+
+def summarize(durations: list[float], items: list[int]) -> dict:
+    values = np.asarray(durations)
+    mean = float(values.mean())
+
+    return {
+        "runs": len(values),
+        "mean": mean,
+        "p50": float(np.percentile(values, 50)),
+        "p99": float(np.percentile(values, 99)),
+        "ops_per_sec": 1 / mean,
+        "items_per_sec": sum(items) / float(values.sum()),
+    }
+
+
+async def measure(
+    func: Callable[[], Awaitable[dict]],
+    durations: list[float],
+) -> dict:
+    started_at = time.perf_counter()
+    result = await func()
+    durations.append(time.perf_counter() - started_at)
+
+    return result
+
+
+async def update_channel_message() -> dict:
+    result = await telegram.update_channel_message()
+    await telegram_client.edit_queue.join()
+
+    return result
+
+
+async def run(
+    universe_coins: int,
+    portfolios: int,
+    repeat: int,
+    port: int,
+    seed: int = 0,
+) -> dict:
+    universe = Universe.synthesize(
+        universe_coins,
+        seed=seed,
+        tick=0.001,
+        volatility=0.01,
+    )
+    runner = web.AppRunner(create_app(universe))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    telegram_client.bot.session = StubSession()
+
+    durations: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    items: dict[str, list[int]] = {stage: [] for stage in STAGES}
+
+    for _ in range(repeat):
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+
+        market_snapshots.invalidate()
+        universe.list_coins(universe_coins * 95 // 100)
+
+        prepare_stats = await measure(prepare.bootstrap, durations["prepare"])
+        items["prepare"].append(prepare_stats["coins"])
+        portfolio_ids = [prepare_stats["portfolio_id"]]
+
+    universe.list_coins()
+
+    for _ in range(portfolios - 1):
+        portfolio_ids.append(await prepare.create_portfolio())
+
+    Telegram.targets.update(
+        ",".join(
+            f"{portfolio_id}:{-1_000_000 - index}:{index + 1}"
+            for index, portfolio_id in enumerate(portfolio_ids)
+        )
+    )
+    get_targets.cache_clear()
+
+    for _ in range(repeat):
+        market_stats = await measure(
+            coins.update_market_data,
+            durations["update_market_data"],
+        )
+        new_coins_stats = await measure(
+            portfolio.add_new_coins,
+            durations["add_new_coins"],
+        )
+        portfolio_stats = await measure(
+            portfolio.update_stats,
+            durations["update_stats"],
+        )
+        telegram_stats = await measure(
+            update_channel_message,
+            durations["update_channel_message"],
+        )
+
+        items["update_market_data"].append(market_stats["coins"])
+        items["add_new_coins"].append(new_coins_stats["added"])
+        items["update_stats"].append(portfolio_stats["holdings"])
+        items["update_channel_message"].append(telegram_stats["targets"])
+
+    await runner.cleanup()
+    await coingecko.client.close()
+
+    return {
+        "coins": universe_coins,
+        "portfolios": portfolios,
+        "holdings": items["update_stats"][-1],
+        "peak_rss_mb": (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        ),
+        "stages": {
+            stage: summarize(durations[stage], items[stage])
+            for stage in STAGES
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run one benchmark scenario in a scratch directory"
+    )
+    parser.add_argument("scenario", help="COINSxPORTFOLIOS, e.g. 1000x100")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    universe_coins, portfolios = map(int, args.scenario.split("x"))
+
+    print(
+        orjson.dumps(
+            asyncio.run(
+                run(
+                    universe_coins,
+                    portfolios,
+                    repeat=args.repeat,
+                    port=args.port,
+                    seed=args.seed,
+                )
+            )
+        ).decode()
+    )
@@ -0,0 +1,244 @@
+import dataclasses
+
+import numpy as np
+
+PERIODS_PER_YEAR = {
+    "1m": 365 * 24 * 60,
+    "1h": 365 * 24,
+    "1d": 365,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class PortfolioAnalytics:
+    key: tuple
+    portfolio_id: str
+    interval: str
+    max_drawdown: float
+    volatility: float
+    rolling_volatility: np.ndarray
+    sharpe: float
+    sortino: float
+    beta: float
+    coin_ids: tuple[str, ...]
+    correlation: np.ndarray
+
+
+def returns(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+
+    if len(values) < 2:
+        return np.empty((0, *values.shape[1:]))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values_returns = np.diff(values, axis=0) / values[:-1]
+
+    values_returns[~np.isfinite(values_returns)] = np.nan
+
+    return values_returns
+
+
+def max_drawdown(values: np.ndarray) -> float:
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+
+    if len(values) == 0:
+        return 0.0
+
+    peaks = np.maximum.accumulate(values)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdowns = np.where(peaks > 0, 1 - values / peaks, 0.0)
+
+    return float(drawdowns.max())
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+
+    if window <= 0 or len(values) < window:
+        return np.empty((0, *values.shape[1:]))
+
+    sums = np.cumsum(values, axis=0)
+    sums = np.concatenate([np.zeros((1, *values.shape[1:])), sums])
+
+    return sums[window:] - sums[:-window]
+
+
+def rolling_volatility(
+    values_returns: np.ndarray,
+    window: int,
+    periods_per_year: int = 1,
+) -> np.ndarray:
+    values_returns = np.asarray(values_returns, dtype=np.float64)
+    values_returns = values_returns - np.nanmean(values_returns, axis=0)
+    values_returns = np.nan_to_num(values_returns)
+
+    if window < 2:
+        return np.empty((0, *values_returns.shape[1:]))
+
+    sums = rolling_sum(values_returns, window)
+    squares = rolling_sum(values_returns**2, window)
+    variances = np.maximum(squares - sums**2 / window, 0) / (window - 1)
+
+    return np.sqrt(variances * periods_per_year)
+
+
+def sharpe(
+    values_returns: np.ndarray,
+    periods_per_year: int = 1,
+    risk_free: float = 0.0,
+) -> float:
+    excess = _finite(values_returns) - risk_free / periods_per_year
+
+    if len(excess) < 2:
+        return np.nan
+
+    deviation = excess.std(ddof=1)
+
+    if deviation == 0:
+        return np.nan
+
+    return float(excess.mean() / deviation * np.sqrt(periods_per_year))
+
+
+def sortino(
+    values_returns: np.ndarray,
+    periods_per_year: int = 1,
+    risk_free: float = 0.0,
+) -> float:
+    excess = _finite(values_returns) - risk_free / periods_per_year
+
+    if len(excess) < 2:
+        return np.nan
+
+    deviation = np.sqrt(np.mean(np.minimum(excess, 0) ** 2))
+
+    if deviation == 0:
+        return np.nan
+
+    return float(excess.mean() / deviation * np.sqrt(periods_per_year))
+
+
+def beta(
+    values_returns: np.ndarray,
+    benchmark_returns: np.ndarray,
+) -> float:
+    values_returns = np.asarray(values_returns, dtype=np.float64)
+    benchmark_returns = np.asarray(benchmark_returns, dtype=np.float64)
+    finite = np.isfinite(values_returns) & np.isfinite(benchmark_returns)
+
+    if finite.sum() < 2:
+        return np.nan
+
+    values_returns = values_returns[finite] - values_returns[finite].mean()
+    benchmark_returns = (
+        benchmark_returns[finite] - benchmark_returns[finite].mean()
+    )
+    variance = np.dot(benchmark_returns, benchmark_returns)
+
+    if variance == 0:
+        return np.nan
+
+    return float(np.dot(values_returns, benchmark_returns) / variance)
+
+
+def correlation(values_returns: np.ndarray) -> np.ndarray:
+    values_returns = np.asarray(values_returns, dtype=np.float64)
+    columns = values_returns.shape[1]
+
+    if len(values_returns) < 2:
+        return np.full((columns, columns), np.nan)
+
+    with np.errstate(invalid="ignore"):
+        values_returns = values_returns - np.nanmean(values_returns, axis=0)
+
+    values_returns = np.nan_to_num(values_returns)
+    deviations = np.sqrt(np.einsum("ij,ij->j", values_returns, values_returns))
+    constant = deviations == 0
+    deviations[constant] = 1
+
+    values_returns /= deviations
+    matrix = values_returns.T @ values_returns
+    np.clip(matrix, -1, 1, out=matrix)
+    np.fill_diagonal(matrix, 1)
+
+    matrix[constant, :] = np.nan
+    matrix[:, constant] = np.nan
+
+    return matrix
+
+
+def _finite(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+
+    return values[np.isfinite(values)]
+
+
+class Analytics:
+    def __init__(
+        self,
+        interval: str = "1h",
+        window: int = 24,
+        lookback: int = 30 * 24,
+        benchmark: str = "bitcoin",
+    ) -> None:
+        self.interval = interval
+        self.window = window
+        self.lookback = lookback
+        self.benchmark = benchmark
+        self._cache: dict[str, PortfolioAnalytics] = {}
+
+    @property
+    def periods_per_year(self) -> int:
+        return PERIODS_PER_YEAR[self.interval]
+
+    def get(self, portfolio_id: str, key: tuple) -> PortfolioAnalytics | None:
+        cached = self._cache.get(portfolio_id)
+
+        if cached is None or cached.key != key:
+            return None
+
+        return cached
+
+    def compute(
+        self,
+        key: tuple,
+        portfolio_id: str,
+        equity: np.ndarray,
+        benchmark: np.ndarray,
+        coin_ids: list[str],
+        prices: np.ndarray,
+    ) -> PortfolioAnalytics:
+        equity_returns = returns(equity)
+        equity_rolling_volatility = rolling_volatility(
+            equity_returns,
+            self.window,
+            self.periods_per_year,
+        )
+
+        self._cache[portfolio_id] = PortfolioAnalytics(
+            key=key,
+            portfolio_id=portfolio_id,
+            interval=self.interval,
+            max_drawdown=max_drawdown(equity),
+            volatility=(
+                float(equity_rolling_volatility[-1])
+                if len(equity_rolling_volatility) > 0
+                else np.nan
+            ),
+            rolling_volatility=equity_rolling_volatility,
+            sharpe=sharpe(equity_returns, self.periods_per_year),
+            sortino=sortino(equity_returns, self.periods_per_year),
+            beta=beta(equity_returns, returns(benchmark)),
+            coin_ids=tuple(coin_ids),
+            correlation=correlation(returns(prices)),
+        )
+
+        return self._cache[portfolio_id]
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+
+analytics = Analytics(interval="1h", window=24, lookback=30 * 24)
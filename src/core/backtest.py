@@ -0,0 +1,229 @@
+import concurrent.futures
+import dataclasses
+import datetime
+import pathlib
+
+import numpy as np
+
+from core import analytics, revaluation
+from core.history import PriceHistory
+
+CHUNK_ROWS = 1024
+
+_market: "Market | None" = None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Variant:
+    buy_amount: float
+    min_mcap: float
+    entry_delay: int = 0
+    rebalance: int = 0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class BacktestResult:
+    variant: Variant
+    coins: int
+    quote_value: float
+    quote_value_invested: float
+    pnl_percentage: float
+    pnl_percentage_ath: float
+    pnl_percentage_atl: float
+    pnl_quote_value: float
+    max_drawdown: float
+    sharpe: float
+
+
+@dataclasses.dataclass(frozen=True)
+class Market:
+    timestamps: np.ndarray
+    prices: np.ndarray
+    market_caps: np.ndarray
+
+    @classmethod
+    def from_history(
+        cls,
+        history: PriceHistory,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        step: datetime.timedelta,
+    ) -> "Market":
+        timestamps = np.arange(
+            np.datetime64(start, "ms"),
+            np.datetime64(end, "ms"),
+            np.timedelta64(step),
+        )
+        ids = list(history.coins.ids)
+
+        return cls(
+            timestamps=timestamps,
+            prices=forward_fill(history.sample(ids, timestamps)),
+            market_caps=history.sample(ids, timestamps, field="market_caps"),
+        )
+
+    @property
+    def periods_per_year(self) -> float:
+        if len(self.timestamps) < 2:
+            return 1.0
+
+        return np.timedelta64(365, "D") / (
+            self.timestamps[1] - self.timestamps[0]
+        )
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "Market":
+        return cls(
+            **{
+                field.name: np.load(path / f"{field.name}.npy", mmap_mode="r")
+                for field in dataclasses.fields(cls)
+            }
+        )
+
+    def save(self, path: pathlib.Path) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+
+        for field in dataclasses.fields(self):
+            np.save(path / f"{field.name}.npy", getattr(self, field.name))
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    rows = np.where(
+        np.isfinite(values) & (values > 0),
+        np.arange(len(values))[:, None],
+        0,
+    )
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = np.take_along_axis(values, rows, axis=0)
+    filled[~(np.isfinite(filled) & (filled > 0))] = np.nan
+
+    return filled
+
+
+def entries(market: Market, variant: Variant) -> np.ndarray:
+    rows = len(market.timestamps)
+
+    with np.errstate(invalid="ignore"):
+        eligible = (market.market_caps > variant.min_mcap) & (
+            market.prices > 0
+        )
+
+    entry = np.argmax(eligible, axis=0) + variant.entry_delay
+    entry[~eligible.any(axis=0)] = rows
+
+    return np.minimum(entry, rows)
+
+
+def run(market: Market, variant: Variant) -> BacktestResult:
+    rows = len(market.timestamps)
+    entry = entries(market, variant)
+    bought = np.flatnonzero(entry < rows)
+    entry = entry[bought]
+
+    quantity = variant.buy_amount / market.prices[entry, bought]
+    quote_value = np.zeros(rows)
+    quote_value_invested = variant.buy_amount * np.cumsum(
+        np.bincount(entry, minlength=rows)
+    )
+
+    epochs = (
+        np.arange(0, rows, variant.rebalance)
+        if variant.rebalance > 0
+        else np.asarray([0])
+    )
+
+    for epoch_start, epoch_end in zip(epochs, [*epochs[1:], rows]):
+        held = entry <= epoch_start
+
+        if epoch_start > 0 and held.any():
+            prices = market.prices[epoch_start, bought][held]
+            quantity[held] = quantity[held] @ prices / held.sum() / prices
+
+        for chunk_start in range(epoch_start, epoch_end, CHUNK_ROWS):
+            chunk_end = min(chunk_start + CHUNK_ROWS, epoch_end)
+            quote_value[chunk_start:chunk_end] = (
+                np.where(
+                    np.arange(chunk_start, chunk_end)[:, None] >= entry,
+                    market.prices[chunk_start:chunk_end, bought],
+                    0.0,
+                )
+                @ quantity
+            )
+
+    return summarize(
+        variant,
+        len(bought),
+        quote_value,
+        quote_value_invested,
+        market.periods_per_year,
+    )
+
+
+def summarize(
+    variant: Variant,
+    coins: int,
+    quote_value: np.ndarray,
+    quote_value_invested: np.ndarray,
+    periods_per_year: float = 1.0,
+) -> BacktestResult:
+    empty = np.full_like(quote_value, np.nan)
+    stats = revaluation.revalue(
+        quote_value=quote_value,
+        quote_value_invested=quote_value_invested,
+        quote_value_ath=empty,
+        quote_value_atl=empty,
+        pnl_percentage_ath=empty,
+        pnl_percentage_atl=empty,
+        pnl_quote_value_ath=empty,
+        pnl_quote_value_atl=empty,
+    )
+    stats = revaluation.revalue(
+        quote_value=quote_value,
+        quote_value_invested=quote_value_invested,
+        quote_value_ath=np.fmax.accumulate(quote_value),
+        quote_value_atl=np.fmin.accumulate(quote_value),
+        pnl_percentage_ath=np.fmax.accumulate(stats["pnl_percentage"]),
+        pnl_percentage_atl=np.fmin.accumulate(stats["pnl_percentage"]),
+        pnl_quote_value_ath=np.fmax.accumulate(stats["pnl_quote_value"]),
+        pnl_quote_value_atl=np.fmin.accumulate(stats["pnl_quote_value"]),
+    )
+
+    if len(quote_value) == 0:
+        return BacktestResult(variant, coins, *([np.nan] * 8))
+
+    growth = 1 + stats["pnl_percentage"] / 100
+
+    return BacktestResult(
+        variant=variant,
+        coins=coins,
+        quote_value=float(quote_value[-1]),
+        quote_value_invested=float(quote_value_invested[-1]),
+        pnl_percentage=float(stats["pnl_percentage"][-1]),
+        pnl_percentage_ath=float(stats["pnl_percentage_ath"][-1]),
+        pnl_percentage_atl=float(stats["pnl_percentage_atl"][-1]),
+        pnl_quote_value=float(stats["pnl_quote_value"][-1]),
+        max_drawdown=analytics.max_drawdown(growth),
+        sharpe=analytics.sharpe(analytics.returns(growth), periods_per_year),
+    )
+
+
+def _load_market(path: pathlib.Path) -> None:
+    global _market
+    _market = Market.load(path)
+
+
+def _run_variant(variant: Variant) -> BacktestResult:
+    return run(_market, variant)
+
+
+def run_many(
+    path: pathlib.Path,
+    variants: list[Variant],
+    processes: int | None = None,
+) -> list[BacktestResult]:
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_load_market,
+        initargs=(path,),
+    ) as executor:
+        return list(executor.map(_run_variant, variants))
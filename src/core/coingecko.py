@@ -1,19 +1,183 @@
+import asyncio
+import datetime
+import math
+import pathlib
+
 import aiohttp
+import msgspec
+from loguru import logger
+
+from core.data import CoinGecko
+from core.http import AdaptiveConcurrency, BaseClient, TokenBucket
+
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+DEFAULT_DATE = "2024-01-01 00:00:00.000000"
+
+rate_limiter = TokenBucket(
+    rate=CoinGecko.requests_per_minute.to_int() / 60,
+)
+concurrency = AdaptiveConcurrency(
+    maximum=CoinGecko.max_concurrency.to_int(),
+)
+
+
+class CoinGeckoError(Exception):
+    def __init__(
+        self,
+        endpoint: str,
+        status: int | None,
+        attempts: int,
+        detail: str = "",
+    ) -> None:
+        self.endpoint = endpoint
+        self.status = status
+        self.attempts = attempts
+        super().__init__(
+            f"CoinGecko request {endpoint} failed after {attempts} attempt(s)"
+            f" with {'status ' + str(status) if status else 'no response'}"
+            + (f": {detail}" if detail else "")
+        )
+
+
+class MarketsCoin(msgspec.Struct, gc=False):
+    id: str
+    symbol: str
+    current_price: float | None = 0.00
+    market_cap: float | None = 0.00
+    price_change_24h: float | None = 0.00
+    price_change_percentage_24h: float | None = 0.00
+    market_cap_change_24h: float | None = 0.00
+    market_cap_change_percentage_24h: float | None = 0.00
+    ath: float | None = 0.00
+    ath_change_percentage: float | None = 0.00
+    ath_date: str | None = None
+    atl: float | None = 0.00
+    atl_change_percentage: float | None = 0.00
+    atl_date: str | None = None
+
+    # column order of models.market.MarketCoinsDatabase
+    def to_row(self, now: str) -> tuple:
+        return (
+            self.id,
+            self.symbol,
+            self.current_price or 0.00,
+            int(self.market_cap or 0),
+            self.price_change_24h,
+            self.price_change_percentage_24h,
+            (
+                int(self.market_cap_change_24h)
+                if self.market_cap_change_24h is not None
+                else None
+            ),
+            self.market_cap_change_percentage_24h,
+            self.ath or 0.00,
+            self.ath_change_percentage or 0.00,
+            (
+                self.ath_date.replace("T", " ", 1).removesuffix("Z")
+                if self.ath_date is not None
+                else DEFAULT_DATE
+            ),
+            self.atl or 0.00,
+            self.atl_change_percentage or 0.00,
+            (
+                self.atl_date.replace("T", " ", 1).removesuffix("Z")
+                if self.atl_date is not None
+                else DEFAULT_DATE
+            ),
+            now,
+            now,
+        )
+
 
-from core.http import BaseClient
+markets_decoder = msgspec.json.Decoder(list[MarketsCoin])
+
+
+def decode_markets(body: bytes) -> list[MarketsCoin]:
+    return markets_decoder.decode(body)
+
+
+def sqlite_now() -> str:
+    return datetime.datetime.now().strftime(SQLITE_DATETIME_FORMAT)
+
+
+class MarketPagePlanner:
+    def __init__(
+        self,
+        min_market_cap: int,
+        per_page: int = 250,
+        prefetch: int = 2,
+        max_pages: int = 0,
+    ) -> None:
+        self.min_market_cap = min_market_cap
+        self.per_page = per_page
+        self.prefetch = prefetch
+        self.max_pages = max_pages
+        self.last_page = max_pages or math.inf
+        self.next_page = 1
+        self.completed_page = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.next_page > self.last_page
+
+    async def acquire(self) -> int | None:
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self.finished
+                or self.next_page <= self.completed_page + self.prefetch
+            )
+
+            if self.finished:
+                return None
+
+            page = self.next_page
+            self.next_page += 1
+
+            return page
+
+    async def complete(
+        self,
+        page: int,
+        coins_market: list[MarketsCoin],
+    ) -> None:
+        async with self._condition:
+            if (
+                len(coins_market) < self.per_page
+                or (coins_market[-1].market_cap or 0) < self.min_market_cap
+            ):
+                self.last_page = min(self.last_page, page)
+
+            elif page == self.max_pages:
+                logger.warning(
+                    f"Market sweep hit the {self.max_pages} page cap,"
+                    f" coins past {page * self.per_page} are skipped"
+                )
+
+            self.completed_page = max(self.completed_page, page)
+            self._condition.notify_all()
 
 
 class CoinGeckoV3Client(BaseClient):
     def __init__(
         self,
         api_key: str,
+        base_url: str = "https://api.coingecko.com/",
+        record_path: pathlib.Path | None = None,
         proxy: str | None = None,
+        rate_limiter: TokenBucket = rate_limiter,
+        concurrency: AdaptiveConcurrency = concurrency,
+        max_retries: int = 3,
     ) -> None:
         self.api_key = api_key
-        self.base_url = "https://api.coingecko.com/"
+        self.base_url = base_url
+        self.record_path = record_path
         self.headers = {"x-cg-demo-api-key": self.api_key}
         self.timeout = 15
         self.proxy = None
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.max_retries = max_retries
 
         super().__init__(
             self.base_url,
@@ -22,6 +186,78 @@ class CoinGeckoV3Client(BaseClient):
             self.proxy,
         )
 
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        headers: dict | None = None,
+        params: dict | None = None,
+        json: dict | None = None,
+    ) -> aiohttp.ClientResponse:
+        response = None
+
+        for attempt in range(self.max_retries + 1):
+            async with self.concurrency:
+                await self.rate_limiter.acquire()
+                response = await super().request(
+                    method=method,
+                    endpoint=endpoint,
+                    headers=headers,
+                    params=params,
+                    json=json,
+                )
+
+                if response is not None and response.status != 429:
+                    self.concurrency.increase()
+                    return response
+
+                self.concurrency.decrease()
+
+                if response is not None:
+                    self.rate_limiter.block(
+                        self.retry_after(response, attempt),
+                    )
+
+                if attempt < self.max_retries and response is not None:
+                    response.release()
+
+        if response is not None:
+            response.release()
+
+        raise CoinGeckoError(
+            endpoint=endpoint,
+            status=(response.status if response is not None else None),
+            attempts=self.max_retries + 1,
+        )
+
+    @staticmethod
+    def retry_after(response: aiohttp.ClientResponse, attempt: int) -> float:
+        retry_after = response.headers.get("Retry-After", "")
+
+        if retry_after.isdigit():
+            return float(retry_after)
+
+        return float(2**attempt)
+
+    async def record(
+        self,
+        response: aiohttp.ClientResponse,
+        page: int | None = None,
+    ) -> pathlib.Path:
+        path = self.record_path / "{now}-{kind}.json".format(
+            now=datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f"),
+            kind=(f"page-{page}" if page is not None else "ids"),
+        )
+        body = await response.read()
+
+        def write() -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(body)
+
+        await asyncio.to_thread(write)
+
+        return path
+
     async def markets(
         self,
         vs_currency: str = "usd",
@@ -65,4 +301,29 @@ class CoinGeckoV3Client(BaseClient):
             params=params,
         )
 
+        if response.status != 200:
+            detail = (await response.text())[:200]
+            response.release()
+
+            raise CoinGeckoError(
+                endpoint="/api/v3/coins/markets/",
+                status=response.status,
+                attempts=1,
+                detail=detail,
+            )
+
+        if self.record_path is not None:
+            await self.record(response, page=(page if ids is None else None))
+
         return response
+
+
+client = CoinGeckoV3Client(
+    api_key=CoinGecko.api_key.to_string(),
+    base_url=CoinGecko.base_url.to_string(),
+    record_path=(
+        pathlib.Path(CoinGecko.record_path.to_string())
+        if CoinGecko.record_path.to_string()
+        else None
+    ),
+)
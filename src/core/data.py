@@ -13,8 +13,8 @@ class Base:
     value: str | None
 
     @classmethod
-    def from_env(cls, key: str) -> "Base":
-        return cls(name=key, value=os.getenv(key))
+    def from_env(cls, key: str, default: str | None = None) -> "Base":
+        return cls(name=key, value=os.getenv(key, default))
 
     @classmethod
     def __log_repr__(cls, log_class) -> None:
@@ -55,6 +55,7 @@ class Base:
 @dataclasses.dataclass
 class Database(Base):
     path = Base.from_env("DATABASE_PATH")
+    history_path = Base.from_env("DATABASE_HISTORY_PATH", "history")
 
     @classmethod
     def url(cls) -> str:
@@ -73,6 +74,22 @@ class Config(Base):
     telegram_message_update_interval = Base.from_env(
         "CONFIG_TELEGRAM_MESSAGE_UPDATE_INTERVAL"
     )
+    market_snapshot_max_coins = Base.from_env(
+        "CONFIG_MARKET_SNAPSHOT_MAX_COINS", "20000"
+    )
+    scheduler_jitter = Base.from_env("CONFIG_SCHEDULER_JITTER", "0")
+    hot_data_update_interval = Base.from_env(
+        "CONFIG_HOT_DATA_UPDATE_INTERVAL", "15"
+    )
+    hot_coins = Base.from_env("CONFIG_HOT_COINS", "10")
+    hot_history_interval = Base.from_env("CONFIG_HOT_HISTORY_INTERVAL", "60")
+    equity_rollup_interval = Base.from_env(
+        "CONFIG_EQUITY_ROLLUP_INTERVAL", "60"
+    )
+    equity_retention_raw = Base.from_env("CONFIG_EQUITY_RETENTION_RAW", "48")
+    equity_retention_1m = Base.from_env("CONFIG_EQUITY_RETENTION_1M", "168")
+    equity_retention_1h = Base.from_env("CONFIG_EQUITY_RETENTION_1H", "2160")
+    equity_retention_1d = Base.from_env("CONFIG_EQUITY_RETENTION_1D", "0")
 
 
 @dataclasses.dataclass
@@ -80,8 +97,20 @@ class Telegram(Base):
     bot_token = Base.from_env("TELEGRAM_BOT_TOKEN")
     channel_id = Base.from_env("TELEGRAM_CHANNEL_ID")
     channel_message_id = Base.from_env("TELEGRAM_CHANNEL_MESSAGE_ID")
+    targets = Base.from_env("TELEGRAM_TARGETS", "")
+    requests_per_second = Base.from_env("TELEGRAM_REQUESTS_PER_SECOND", "25")
+    max_concurrency = Base.from_env("TELEGRAM_MAX_CONCURRENCY", "8")
 
 
 @dataclasses.dataclass
 class CoinGecko(Base):
     api_key = Base.from_env("COINGECKO_API_KEY")
+    requests_per_minute = Base.from_env("COINGECKO_REQUESTS_PER_MINUTE", "30")
+    max_concurrency = Base.from_env("COINGECKO_MAX_CONCURRENCY", "10")
+    prefetch_pages = Base.from_env("COINGECKO_PREFETCH_PAGES", "2")
+    max_pages = Base.from_env("COINGECKO_MAX_PAGES", "0")
+    base_url = Base.from_env(
+        "COINGECKO_BASE_URL",
+        "https://api.coingecko.com/",
+    )
+    record_path = Base.from_env("COINGECKO_RECORD_PATH", "")
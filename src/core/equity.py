@@ -0,0 +1,101 @@
+import datetime
+
+import numpy as np
+
+INTERVALS = {
+    "1m": "datetime64[m]",
+    "1h": "datetime64[h]",
+    "1d": "datetime64[D]",
+}
+SECONDS = {
+    "1m": 60,
+    "1h": 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+SOURCES = {
+    "1m": None,
+    "1h": "1m",
+    "1d": "1h",
+}
+
+
+def floor(timestamp: datetime.datetime, interval: str) -> datetime.datetime:
+    return (
+        np.datetime64(timestamp, "us")
+        .astype(INTERVALS[interval])
+        .astype("datetime64[us]")
+        .item()
+    )
+
+
+def rollup(candles: list, interval: str) -> list[dict]:
+    if len(candles) == 0:
+        return []
+
+    columns = dict(zip(candles[0]._fields, zip(*candles)))
+    portfolio_id = np.asarray(columns["portfolio_id"], dtype=object)
+    opened_at = np.asarray(columns["opened_at"], dtype="datetime64[us]")
+    opened_at = opened_at.astype(INTERVALS[interval])
+
+    starts = np.flatnonzero(
+        np.r_[
+            True,
+            (portfolio_id[1:] != portfolio_id[:-1])
+            | (opened_at[1:] != opened_at[:-1]),
+        ]
+    )
+    ends = np.r_[starts[1:], len(opened_at)] - 1
+
+    return [
+        dict(
+            zip(
+                (
+                    "portfolio_id",
+                    "interval",
+                    "opened_at",
+                    "open",
+                    "high",
+                    "low",
+                    "close",
+                    "quote_value_invested",
+                    "points",
+                ),
+                row,
+            )
+        )
+        for row in zip(
+            portfolio_id[starts].tolist(),
+            [interval] * len(starts),
+            opened_at[starts].astype("datetime64[us]").tolist(),
+            np.asarray(columns["open"], dtype=np.float64)[starts].tolist(),
+            np.maximum.reduceat(
+                np.asarray(columns["high"], dtype=np.float64), starts
+            ).tolist(),
+            np.minimum.reduceat(
+                np.asarray(columns["low"], dtype=np.float64), starts
+            ).tolist(),
+            np.asarray(columns["close"], dtype=np.float64)[ends].tolist(),
+            np.asarray(
+                columns["quote_value_invested"],
+                dtype=np.float64,
+            )[ends].tolist(),
+            np.add.reduceat(
+                np.asarray(columns["points"], dtype=np.int64), starts
+            ).tolist(),
+        )
+    ]
+
+
+class EquitySampler:
+    def __init__(self, interval: str = "1m") -> None:
+        self.interval = interval
+        self.opened_at: datetime.datetime | None = None
+
+    def due(self, timestamp: datetime.datetime) -> bool:
+        return floor(timestamp, self.interval) != self.opened_at
+
+    def mark(self, timestamp: datetime.datetime) -> None:
+        self.opened_at = floor(timestamp, self.interval)
+
+
+equity_sampler = EquitySampler(interval="1m")
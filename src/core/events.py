@@ -0,0 +1,109 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+MARKET_SWEEP = "market_sweep"
+MARKET_SNAPSHOT = "market_snapshot"
+PORTFOLIO_REVALUED = "portfolio_revalued"
+
+
+class Stage:
+    def __init__(
+        self,
+        topic: str,
+        func: Callable[[int], Awaitable[Any]],
+        min_interval: float = 0.00,
+    ) -> None:
+        self.topic = topic
+        self.func = func
+        self.name = func.__name__
+        self.min_interval = min_interval
+
+        self.requested = 0
+        self.started = 0
+        self.consumed = 0
+        self.runs = 0
+        self.coalesced = 0
+        self.last_run_at: float | None = None
+
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def notify(self, version: int) -> None:
+        if version <= max(self.requested, self.consumed):
+            return None
+
+        if self.requested > self.started:
+            self.coalesced += 1
+
+        self.requested = version
+
+        if not self.running:
+            self._task = asyncio.create_task(self._drain())
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _drain(self) -> None:
+        while self.requested > self.consumed:
+            if self.last_run_at is not None:
+                await asyncio.sleep(
+                    self.last_run_at + self.min_interval - time.monotonic()
+                )
+
+            version = self.started = self.requested
+            self.last_run_at = time.monotonic()
+            self.runs += 1
+
+            try:
+                await self.func(version)
+
+            except Exception as e:
+                logger.error(
+                    f"Stage '{self.name}' failed on version {version}:"
+                    f" {e.__repr__()}"
+                )
+
+            self.consumed = version
+
+
+class EventBus:
+    def __init__(self) -> None:
+        self.versions: dict[str, int] = {}
+        self._stages: dict[str, list[Stage]] = defaultdict(list)
+
+    def subscribe(
+        self,
+        topic: str,
+        min_interval: float = 0.00,
+    ) -> Callable[[Callable[[int], Awaitable[Any]]], Stage]:
+        def decorator(func: Callable[[int], Awaitable[Any]]) -> Stage:
+            stage = Stage(topic=topic, func=func, min_interval=min_interval)
+            self._stages[topic].append(stage)
+
+            return stage
+
+        return decorator
+
+    def publish(self, topic: str, version: int) -> None:
+        self.versions[topic] = version
+
+        for stage in self._stages[topic]:
+            stage.notify(version)
+
+    def stages(self) -> list[Stage]:
+        return [stage for stages in self._stages.values() for stage in stages]
+
+    def cancel(self) -> None:
+        for stage in self.stages():
+            stage.cancel()
+
+
+bus = EventBus()
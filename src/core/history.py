@@ -0,0 +1,340 @@
+import datetime
+import pathlib
+import threading
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from core.data import Database
+
+SEGMENT_WIDTH_STEP = 1024
+
+
+class CoinDictionary:
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self.ids: list[str] = (
+            path.read_text().splitlines() if path.exists() else []
+        )
+        self.indices: dict[str, int] = {
+            id: index for index, id in enumerate(self.ids)
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def get(self, id: str) -> int | None:
+        return self.indices.get(id)
+
+    def get_or_add(self, ids: Iterable[str]) -> np.ndarray:
+        new_ids = []
+        indices = []
+
+        for id in ids:
+            index = self.indices.get(id)
+
+            if index is None:
+                index = self.indices[id] = len(self.ids)
+                self.ids.append(id)
+                new_ids.append(id)
+
+            indices.append(index)
+
+        if len(new_ids) > 0:
+            with self.path.open("a") as file:
+                file.write("".join(f"{id}\n" for id in new_ids))
+
+        return np.asarray(indices, dtype=np.intp)
+
+
+class Segment:
+    def __init__(self, path: pathlib.Path, width: int | None = None) -> None:
+        self.path = path
+
+        width_path = path / "width"
+
+        if not width_path.exists():
+            if width is None:
+                raise ValueError(f"Segment {path} has no width file")
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            width_path.write_text(str(width))
+
+        self.width = int(width_path.read_text())
+
+    @property
+    def rows(self) -> int:
+        return min(
+            self._size("timestamps") // 8,
+            self._size("prices") // (self.width * 8),
+            self._size("market_caps") // (self.width * 8),
+        )
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._map("timestamps", np.dtype("datetime64[ms]"), ())
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self._map("prices", np.dtype(np.float64), (self.width,))
+
+    @property
+    def market_caps(self) -> np.ndarray:
+        return self._map("market_caps", np.dtype(np.float64), (self.width,))
+
+    def append(
+        self,
+        timestamp: np.datetime64,
+        prices: np.ndarray,
+        market_caps: np.ndarray,
+    ) -> None:
+        rows = self.rows
+
+        for name, values in (
+            ("prices", prices),
+            ("market_caps", market_caps),
+            ("timestamps", np.asarray([timestamp], dtype="datetime64[ms]")),
+        ):
+            with (self.path / name).open("r+b" if rows else "wb") as file:
+                file.seek(rows * values.nbytes)
+                file.write(values.tobytes())
+                file.truncate()
+
+    def row(self, row: int) -> tuple[np.ndarray, np.ndarray]:
+        return self.prices[row], self.market_caps[row]
+
+    def column(
+        self,
+        index: int,
+        start: np.datetime64 | None = None,
+        end: np.datetime64 | None = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        timestamps = self.timestamps
+        rows = slice(
+            (
+                0
+                if start is None
+                else int(np.searchsorted(timestamps, start, side="left"))
+            ),
+            (
+                len(timestamps)
+                if end is None
+                else int(np.searchsorted(timestamps, end, side="right"))
+            ),
+        )
+
+        if index >= self.width:
+            empty = np.full(rows.stop - rows.start, np.nan)
+            return timestamps[rows], empty, empty
+
+        return (
+            timestamps[rows],
+            self.prices[rows, index],
+            self.market_caps[rows, index],
+        )
+
+    def _size(self, name: str) -> int:
+        path = self.path / name
+
+        return path.stat().st_size if path.exists() else 0
+
+    def _map(
+        self,
+        name: str,
+        dtype: np.dtype,
+        shape: tuple[int, ...],
+    ) -> np.ndarray:
+        rows = self.rows
+
+        if rows == 0:
+            return np.empty((0, *shape), dtype=dtype)
+
+        return np.memmap(
+            self.path / name,
+            dtype=dtype,
+            mode="r",
+            shape=(rows, *shape),
+        )
+
+
+class PriceHistory:
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self.coins = CoinDictionary(path / "coins")
+        self.updated_at: datetime.datetime | None = None
+        self._lock = threading.Lock()
+
+    def segments(
+        self,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+    ) -> Iterator[Segment]:
+        for path in sorted(
+            self.path.glob("????-??-??.*"),
+            key=(lambda k: (k.name[:10], int(k.name[11:]))),
+        ):
+            day = datetime.date.fromisoformat(path.name[:10])
+
+            if not (path / "width").exists():
+                continue
+
+            if (start is None or day >= start) and (end is None or day <= end):
+                yield Segment(path)
+
+    def append(
+        self,
+        timestamp: datetime.datetime,
+        ids: list[str],
+        prices: Iterable[float],
+        market_caps: Iterable[float],
+        partial: bool = False,
+    ) -> int:
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            indices = self.coins.get_or_add(ids)
+            segment = self._segment(timestamp.date(), len(self.coins))
+
+            row_prices = np.full(segment.width, np.nan)
+            row_market_caps = np.full(segment.width, np.nan)
+
+            if partial and (previous := self.at(timestamp)) is not None:
+                _, previous_prices, previous_market_caps = previous
+                width = min(segment.width, len(previous_prices))
+                row_prices[:width] = previous_prices[:width]
+                row_market_caps[:width] = previous_market_caps[:width]
+
+            row_prices[indices] = np.fromiter(prices, dtype=np.float64)
+            row_market_caps[indices] = np.fromiter(
+                market_caps,
+                dtype=np.float64,
+            )
+
+            segment.append(
+                np.datetime64(timestamp, "ms"),
+                row_prices,
+                row_market_caps,
+            )
+            self.updated_at = timestamp
+
+            return segment.rows
+
+    def coin(
+        self,
+        id: str,
+        start: datetime.datetime | None = None,
+        end: datetime.datetime | None = None,
+    ) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        index = self.coins.get(id)
+
+        if index is None:
+            return None
+
+        for segment in self.segments(
+            start=(start.date() if start is not None else None),
+            end=(end.date() if end is not None else None),
+        ):
+            yield segment.column(
+                index,
+                start=(np.datetime64(start, "ms") if start else None),
+                end=(np.datetime64(end, "ms") if end else None),
+            )
+
+    def coin_series(
+        self,
+        id: str,
+        start: datetime.datetime | None = None,
+        end: datetime.datetime | None = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        columns = list(self.coin(id, start, end))
+
+        if len(columns) == 0:
+            return (
+                np.empty(0, dtype="datetime64[ms]"),
+                np.empty(0),
+                np.empty(0),
+            )
+
+        return tuple(np.concatenate(column) for column in zip(*columns))
+
+    def at(
+        self,
+        timestamp: datetime.datetime,
+    ) -> tuple[np.datetime64, np.ndarray, np.ndarray] | None:
+        moment = np.datetime64(timestamp, "ms")
+
+        for segment in reversed(list(self.segments(end=timestamp.date()))):
+            timestamps = segment.timestamps
+            row = int(np.searchsorted(timestamps, moment, side="right")) - 1
+
+            if row >= 0:
+                return (timestamps[row], *segment.row(row))
+
+        return None
+
+    def sample(
+        self,
+        ids: list[str],
+        timestamps: np.ndarray,
+        field: str = "prices",
+    ) -> np.ndarray:
+        moments = np.asarray(timestamps, dtype="datetime64[ms]")
+        values = np.full((len(moments), len(ids)), np.nan)
+
+        if len(moments) == 0:
+            return values
+
+        indices = np.fromiter(
+            (self.coins.indices.get(id, -1) for id in ids),
+            dtype=np.intp,
+            count=len(ids),
+        )
+        known = np.flatnonzero(indices >= 0)
+        indices = indices[known]
+
+        segments = [
+            segment
+            for segment in self.segments(
+                start=(
+                    moments.min().astype("datetime64[D]").item()
+                    - datetime.timedelta(days=1)
+                ),
+                end=moments.max().astype("datetime64[D]").item(),
+            )
+            if segment.rows > 0
+        ]
+
+        for segment, next_segment in zip(segments, [*segments[1:], None]):
+            timestamps = segment.timestamps
+            sampled = moments >= timestamps[0]
+
+            if next_segment is not None:
+                sampled &= moments < next_segment.timestamps[0]
+
+            sampled = np.flatnonzero(sampled)
+            columns = indices < segment.width
+
+            if len(sampled) == 0 or not columns.any():
+                continue
+
+            rows = np.searchsorted(timestamps, moments[sampled], side="right")
+            values[np.ix_(sampled, known[columns])] = getattr(segment, field)[
+                rows - 1
+            ][:, indices[columns]]
+
+        return values
+
+    def _segment(self, day: datetime.date, coins: int) -> Segment:
+        segments = list(self.segments(start=day, end=day))
+
+        if len(segments) > 0 and segments[-1].width >= coins:
+            return segments[-1]
+
+        index = len(list(self.path.glob(f"{day.isoformat()}.*")))
+
+        return Segment(
+            self.path / f"{day.isoformat()}.{index}",
+            width=(coins // SEGMENT_WIDTH_STEP + 1) * SEGMENT_WIDTH_STEP,
+        )
+
+
+price_history = PriceHistory(pathlib.Path(Database.history_path.to_string()))
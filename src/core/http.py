@@ -1,9 +1,82 @@
 import asyncio
+import time
 
 import aiohttp
 import orjson
 
 
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.00)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.00
+        self._lock = asyncio.Lock()
+
+    def block(self, seconds: float) -> None:
+        self.blocked_until = max(
+            self.blocked_until,
+            time.monotonic() + seconds,
+        )
+        self.tokens = 0.00
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated_at) * self.rate,
+                )
+                self.updated_at = now
+
+                if self.tokens >= 1.00:
+                    self.tokens -= 1.00
+                    return None
+
+                await asyncio.sleep((1.00 - self.tokens) / self.rate)
+
+
+class AdaptiveConcurrency:
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 30,
+    ) -> None:
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> "AdaptiveConcurrency":
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self.in_flight < int(self.limit)
+            )
+            self.in_flight += 1
+
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def increase(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1.00 / self.limit)
+
+    def decrease(self) -> None:
+        self.limit = max(self.minimum, self.limit / 2)
+
+
 class BaseClient:
     def __init__(
         self,
@@ -11,6 +84,9 @@ class BaseClient:
         headers: dict | None = None,
         timeout: float = 5.00,
         proxy: str | None = None,
+        connection_limit: int = 100,
+        keepalive_timeout: float = 75.00,
+        dns_cache_ttl: int = 300,
     ) -> None:
         self.base_url = base_url
         self.headers = headers
@@ -19,13 +95,34 @@ class BaseClient:
             sock_connect=timeout,
             sock_read=timeout,
         )
-        self.session = aiohttp.ClientSession(
-            base_url=self.base_url,
-            headers=self.headers,
-            timeout=self.timeout,
-            json_serialize=(lambda x: orjson.dumps(x).decode()),
-            loop=asyncio.get_event_loop(),
-        )
+        self.connection_limit = connection_limit
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=self.timeout,
+                json_serialize=(lambda x: orjson.dumps(x).decode()),
+                connector=aiohttp.TCPConnector(
+                    limit=self.connection_limit,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                    use_dns_cache=True,
+                ),
+            )
+
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+        self._session = None
 
     async def request(
         self,
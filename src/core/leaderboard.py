@@ -0,0 +1,149 @@
+import dataclasses
+import types
+from typing import Mapping
+
+import numpy as np
+
+from core.data import Config
+from core.revaluation import Holdings
+
+RANKS = ("quote_value", "pnl_percentage")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class LeaderboardCoin:
+    id: str
+    portfolio_id: str
+    coin_id: str
+    quote_value: float
+    quote_value_invested: float
+    pnl_percentage: float
+    pnl_quote_value: float
+
+
+@dataclasses.dataclass(frozen=True)
+class Ranking:
+    gainers: tuple[LeaderboardCoin, ...]
+    losers: tuple[LeaderboardCoin, ...]
+
+
+class Leaderboard:
+    def __init__(self, size: int = 10) -> None:
+        self.size = size
+        self.version = 0
+        self._rankings: Mapping[str, Mapping[str, Ranking]] = {}
+
+    def __contains__(self, portfolio_id: str) -> bool:
+        return portfolio_id in self._rankings
+
+    def update(
+        self,
+        holdings: Holdings,
+        holdings_stats: dict[str, np.ndarray],
+        version: int = 0,
+    ) -> None:
+        portfolio_ids = holdings.portfolio_id.tolist()
+        portfolios_index = {
+            portfolio_id: index
+            for index, portfolio_id in enumerate(dict.fromkeys(portfolio_ids))
+        }
+        groups = np.fromiter(
+            map(portfolios_index.__getitem__, portfolio_ids),
+            dtype=np.intp,
+            count=len(portfolio_ids),
+        )
+        losing = holdings_stats["pnl_percentage"] > -99
+        ranked: dict[str, tuple[list[list[int]], list[list[int]]]] = {}
+
+        for rank_by in RANKS:
+            order = np.lexsort((holdings_stats[rank_by], groups))
+            ranked[rank_by] = (
+                self.top(order, groups, len(portfolios_index), largest=True),
+                self.top(order[losing[order]], groups, len(portfolios_index)),
+            )
+
+        indices = np.unique(
+            np.fromiter(
+                (
+                    index
+                    for portfolios_top in ranked.values()
+                    for top in portfolios_top
+                    for portfolio_top in top
+                    for index in portfolio_top
+                ),
+                dtype=np.intp,
+            )
+        )
+        coins = dict(
+            zip(
+                indices.tolist(),
+                map(
+                    LeaderboardCoin,
+                    holdings.id[indices].tolist(),
+                    holdings.portfolio_id[indices].tolist(),
+                    holdings.coin_id[indices].tolist(),
+                    holdings_stats["quote_value"][indices].tolist(),
+                    holdings.quote_value_invested[indices].tolist(),
+                    holdings_stats["pnl_percentage"][indices].tolist(),
+                    holdings_stats["pnl_quote_value"][indices].tolist(),
+                ),
+            )
+        )
+        self._rankings = types.MappingProxyType(
+            {
+                portfolio_id: types.MappingProxyType(
+                    {
+                        rank_by: Ranking(
+                            gainers=tuple(map(coins.get, gainers[group])),
+                            losers=tuple(map(coins.get, losers[group])),
+                        )
+                        for rank_by, (gainers, losers) in ranked.items()
+                    }
+                )
+                for portfolio_id, group in portfolios_index.items()
+            }
+        )
+        self.version = version
+
+    def top(
+        self,
+        order: np.ndarray,
+        groups: np.ndarray,
+        count: int,
+        largest: bool = False,
+    ) -> list[list[int]]:
+        bounds = np.searchsorted(groups[order], np.arange(count + 1)).tolist()
+
+        if largest:
+            return [
+                order[max(start, end - self.size) : end][::-1].tolist()
+                for start, end in zip(bounds[:-1], bounds[1:])
+            ]
+
+        return [
+            order[start : min(end, start + self.size)].tolist()
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+
+    def gainers(
+        self,
+        portfolio_id: str,
+        limit: int | None = None,
+        rank_by: str = "quote_value",
+    ) -> tuple[LeaderboardCoin, ...]:
+        ranking = self._rankings.get(portfolio_id, {}).get(rank_by)
+
+        return () if ranking is None else ranking.gainers[:limit]
+
+    def losers(
+        self,
+        portfolio_id: str,
+        limit: int | None = None,
+        rank_by: str = "quote_value",
+    ) -> tuple[LeaderboardCoin, ...]:
+        ranking = self._rankings.get(portfolio_id, {}).get(rank_by)
+
+        return () if ranking is None else ranking.losers[:limit]
+
+
+leaderboard = Leaderboard(size=max(10, Config.hot_coins.to_int()))
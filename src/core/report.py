@@ -0,0 +1,152 @@
+import dataclasses
+import datetime
+import functools
+import types
+from typing import Iterable, Mapping
+
+from core.data import Config, Telegram
+from core.leaderboard import LeaderboardCoin
+from core.snapshot import MarketSnapshot
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ReportCoin:
+    coin_id: str
+    symbol: str
+    quote_value: float
+    quote_value_invested: float
+
+    @classmethod
+    def from_leaderboard(
+        cls,
+        coin: LeaderboardCoin,
+        market_snapshot: MarketSnapshot,
+    ) -> "ReportCoin":
+        market_coin = market_snapshot.get(coin.coin_id)
+
+        return cls(
+            coin_id=coin.coin_id,
+            symbol=(market_coin.symbol if market_coin else coin.coin_id),
+            quote_value=coin.quote_value,
+            quote_value_invested=coin.quote_value_invested,
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class Report:
+    version: int
+    portfolio_id: str
+    quote_value: float
+    quote_value_invested: float
+    pnl_percentage: float
+    pnl_percentage_ath: float
+    pnl_percentage_atl: float
+    pnl_quote_value_ath: float
+    pnl_quote_value_atl: float
+    coins: int
+    gainers: tuple[ReportCoin, ...]
+    losers: tuple[ReportCoin, ...]
+    created_at: datetime.datetime
+
+    @classmethod
+    def from_stats(
+        cls,
+        version: int,
+        portfolio_id: str,
+        portfolio_stats: Mapping[str, float],
+        coins: int,
+        gainers: Iterable[LeaderboardCoin],
+        losers: Iterable[LeaderboardCoin],
+        market_snapshot: MarketSnapshot,
+    ) -> "Report":
+        return cls(
+            version=version,
+            portfolio_id=portfolio_id,
+            quote_value=portfolio_stats["quote_value"],
+            quote_value_invested=portfolio_stats["quote_value_invested"],
+            pnl_percentage=portfolio_stats["pnl_percentage"],
+            pnl_percentage_ath=portfolio_stats["pnl_percentage_ath"],
+            pnl_percentage_atl=portfolio_stats["pnl_percentage_atl"],
+            pnl_quote_value_ath=portfolio_stats["pnl_quote_value_ath"],
+            pnl_quote_value_atl=portfolio_stats["pnl_quote_value_atl"],
+            coins=coins,
+            gainers=tuple(
+                ReportCoin.from_leaderboard(coin, market_snapshot)
+                for coin in gainers
+            ),
+            losers=tuple(
+                ReportCoin.from_leaderboard(coin, market_snapshot)
+                for coin in losers
+            ),
+            created_at=datetime.datetime.now(),
+        )
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Target:
+    portfolio_id: str
+    chat_id: int
+    message_id: int
+
+    @classmethod
+    def from_string(cls, value: str) -> "Target":
+        portfolio_id, chat_id, message_id = value.strip().rsplit(":", 2)
+
+        return cls(
+            portfolio_id=portfolio_id,
+            chat_id=int(chat_id),
+            message_id=int(message_id),
+        )
+
+
+@functools.cache
+def get_targets() -> tuple[Target, ...]:
+    if Telegram.targets.to_string().strip():
+        return tuple(
+            Target.from_string(value)
+            for value in Telegram.targets.to_string().split(",")
+            if value.strip()
+        )
+
+    return (
+        Target(
+            portfolio_id=Config.portfolio_id.to_string(),
+            chat_id=Telegram.channel_id.to_int(),
+            message_id=Telegram.channel_message_id.to_int(),
+        ),
+    )
+
+
+@dataclasses.dataclass(frozen=True)
+class Channel:
+    id: int
+    username: str | None
+
+    def post_url(self, message_id: int) -> str:
+        return "https://t.me/{username}/{message_id}".format(
+            username=self.username,
+            message_id=message_id,
+        )
+
+
+class Reports:
+    def __init__(self, coins: int = 5) -> None:
+        self.coins = coins
+        self.version = 0
+        self.channels: dict[int, Channel] = {}
+        self._reports: Mapping[str, Report] = types.MappingProxyType({})
+
+    def __len__(self) -> int:
+        return len(self._reports)
+
+    def get(self, portfolio_id: str) -> Report | None:
+        return self._reports.get(portfolio_id)
+
+    def publish(self, reports: Iterable[Report], version: int) -> None:
+        self._reports = types.MappingProxyType(
+            {report.portfolio_id: report for report in reports}
+        )
+        self.version = version
+
+
+reports = Reports(coins=5)
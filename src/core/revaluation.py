@@ -0,0 +1,147 @@
+import dataclasses
+from typing import Mapping
+
+import numpy as np
+
+REVALUED_COLUMNS = (
+    "quote_value",
+    "quote_value_ath",
+    "quote_value_atl",
+    "pnl_percentage",
+    "pnl_percentage_ath",
+    "pnl_percentage_atl",
+    "pnl_quote_value",
+    "pnl_quote_value_ath",
+    "pnl_quote_value_atl",
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class Holdings:
+    id: np.ndarray
+    portfolio_id: np.ndarray
+    coin_id: np.ndarray
+    quantity: np.ndarray
+    current_price: np.ndarray
+    quote_value_invested: np.ndarray
+    quote_value: np.ndarray
+    quote_value_ath: np.ndarray
+    quote_value_atl: np.ndarray
+    pnl_percentage: np.ndarray
+    pnl_percentage_ath: np.ndarray
+    pnl_percentage_atl: np.ndarray
+    pnl_quote_value: np.ndarray
+    pnl_quote_value_ath: np.ndarray
+    pnl_quote_value_atl: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: list, prices: Mapping[str, float]) -> "Holdings":
+        columns = dict(zip(rows[0]._fields, zip(*rows))) if rows else {}
+        columns["current_price"] = [
+            prices.get(coin_id, np.nan)
+            for coin_id in columns.get("coin_id", ())
+        ]
+        priced = ~np.isnan(
+            np.asarray(columns["current_price"], dtype=np.float64)
+        )
+
+        return cls(
+            **{
+                field.name: np.asarray(
+                    columns.get(field.name, ()),
+                    dtype=(
+                        object
+                        if field.name in ("id", "portfolio_id", "coin_id")
+                        else np.float64
+                    ),
+                )[priced]
+                for field in dataclasses.fields(cls)
+            }
+        )
+
+    def __len__(self) -> int:
+        return self.id.size
+
+    def previous(self) -> dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in REVALUED_COLUMNS}
+
+
+def revalue(
+    quote_value: np.ndarray,
+    quote_value_invested: np.ndarray,
+    quote_value_ath: np.ndarray,
+    quote_value_atl: np.ndarray,
+    pnl_percentage_ath: np.ndarray,
+    pnl_percentage_atl: np.ndarray,
+    pnl_quote_value_ath: np.ndarray,
+    pnl_quote_value_atl: np.ndarray,
+) -> dict[str, np.ndarray]:
+    pnl_quote_value = quote_value - quote_value_invested
+    pnl_percentage = np.zeros_like(quote_value)
+    np.divide(
+        pnl_quote_value * 100,
+        quote_value_invested,
+        out=pnl_percentage,
+        where=(quote_value_invested != 0),
+    )
+    pnl_percentage = np.maximum(pnl_percentage, -99.9999)
+
+    return {
+        "quote_value": quote_value,
+        "quote_value_ath": np.fmax(quote_value, quote_value_ath),
+        "quote_value_atl": np.fmin(quote_value, quote_value_atl),
+        "pnl_percentage": pnl_percentage,
+        "pnl_percentage_ath": np.fmax(pnl_percentage, pnl_percentage_ath),
+        "pnl_percentage_atl": np.fmin(pnl_percentage, pnl_percentage_atl),
+        "pnl_quote_value": pnl_quote_value,
+        "pnl_quote_value_ath": np.fmax(pnl_quote_value, pnl_quote_value_ath),
+        "pnl_quote_value_atl": np.fmin(pnl_quote_value, pnl_quote_value_atl),
+    }
+
+
+def revalue_holdings(holdings: Holdings) -> dict[str, np.ndarray]:
+    return revalue(
+        quote_value=holdings.quantity * holdings.current_price,
+        quote_value_invested=holdings.quote_value_invested,
+        quote_value_ath=holdings.quote_value_ath,
+        quote_value_atl=holdings.quote_value_atl,
+        pnl_percentage_ath=holdings.pnl_percentage_ath,
+        pnl_percentage_atl=holdings.pnl_percentage_atl,
+        pnl_quote_value_ath=holdings.pnl_quote_value_ath,
+        pnl_quote_value_atl=holdings.pnl_quote_value_atl,
+    )
+
+
+def changed(
+    previous: dict[str, np.ndarray],
+    current: dict[str, np.ndarray],
+) -> np.ndarray:
+    mask = np.zeros(len(next(iter(current.values()))), dtype=bool)
+
+    for name, values in current.items():
+        mask |= ~(
+            (values == previous[name])
+            | (np.isnan(values) & np.isnan(previous[name]))
+        )
+
+    return mask
+
+
+def select(
+    columns: dict[str, np.ndarray],
+    mask: np.ndarray,
+) -> dict[str, np.ndarray]:
+    return {name: values[mask] for name, values in columns.items()}
+
+
+def column(items: list, name: str) -> np.ndarray:
+    return np.asarray(
+        [getattr(item, name) for item in items], dtype=np.float64
+    )
+
+
+def to_rows(ids: np.ndarray, columns: dict[str, np.ndarray]) -> list[dict]:
+    names = ("id", *columns.keys())
+    values = (ids.tolist(), *(array.tolist() for array in columns.values()))
+
+    return [dict(zip(names, row)) for row in zip(*values)]
@@ -0,0 +1,123 @@
+import dataclasses
+import datetime
+import functools
+import types
+from typing import Iterable, Mapping
+
+from core.data import Config
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class MarketCoin:
+    id: str
+    symbol: str
+    current_price: float
+    market_cap: int
+
+    @classmethod
+    def from_row(cls, row) -> "MarketCoin":
+        return cls(
+            id=row.id,
+            symbol=row.symbol,
+            current_price=row.current_price,
+            market_cap=row.market_cap,
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class MarketSnapshot:
+    version: int
+    coins: Mapping[str, MarketCoin]
+    created_at: datetime.datetime
+
+    def __len__(self) -> int:
+        return len(self.coins)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.coins
+
+    def get(self, id: str) -> MarketCoin | None:
+        return self.coins.get(id)
+
+    @functools.cached_property
+    def prices(self) -> Mapping[str, float]:
+        return types.MappingProxyType(
+            {id: coin.current_price for id, coin in self.coins.items()}
+        )
+
+
+class MarketSnapshots:
+    def __init__(self, max_coins: int) -> None:
+        self.max_coins = max_coins
+        self.version = 0
+        self.pinned: frozenset[str] = frozenset()
+        self._current: MarketSnapshot | None = None
+
+    @property
+    def current(self) -> MarketSnapshot | None:
+        return self._current
+
+    def publish(
+        self,
+        coins: Iterable[MarketCoin],
+        merge: bool = False,
+    ) -> MarketSnapshot:
+        snapshot_coins = (
+            dict(self._current.coins)
+            if merge and self._current is not None
+            else {}
+        )
+        snapshot_coins.update((coin.id, coin) for coin in coins)
+
+        if len(snapshot_coins) > self.max_coins:
+            snapshot_coins = {
+                coin.id: coin
+                for coin in sorted(
+                    snapshot_coins.values(),
+                    key=(lambda k: k.market_cap or 0),
+                    reverse=True,
+                )[: self.max_coins]
+            } | {
+                id: snapshot_coins[id]
+                for id in self.pinned
+                if id in snapshot_coins
+            }
+
+        self.version += 1
+        self._current = MarketSnapshot(
+            version=self.version,
+            coins=types.MappingProxyType(snapshot_coins),
+            created_at=datetime.datetime.now(),
+        )
+
+        return self._current
+
+    def pin(self, ids: Iterable[str]) -> frozenset[str]:
+        self.pinned = frozenset(ids)
+
+        return self.pinned
+
+    def invalidate(self) -> None:
+        self._current = None
+
+
+class HotCoins:
+    def __init__(self, max_coins: int) -> None:
+        self.max_coins = max_coins
+        self.ids: tuple[str, ...] = ()
+        self.updated_at: datetime.datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def update(self, ids: Iterable[str]) -> tuple[str, ...]:
+        self.ids = tuple(sorted(set(ids)))
+        self.updated_at = datetime.datetime.now()
+
+        return self.ids
+
+
+market_snapshots = MarketSnapshots(
+    max_coins=Config.market_snapshot_max_coins.to_int(),
+)
+hot_coins = HotCoins(max_coins=Config.hot_coins.to_int())
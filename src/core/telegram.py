@@ -1,9 +1,232 @@
+import asyncio
+import collections
+import dataclasses
+import functools
+import hashlib
+
 import aiogram
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils import markdown as md
+from loguru import logger
 
 from core.data import Telegram
+from core.http import TokenBucket
 
 bot = aiogram.Bot(
     token=Telegram.bot_token.to_string(),
     parse_mode=aiogram.enums.ParseMode.HTML,
 )
+
+
+@dataclasses.dataclass(frozen=True)
+class Edit:
+    chat_id: int
+    message_id: int
+    text: str
+    reply_markup: InlineKeyboardMarkup | None = None
+
+    @property
+    def target(self) -> tuple[int, int]:
+        return (self.chat_id, self.message_id)
+
+    @functools.cached_property
+    def digest(self) -> str:
+        content = self.text + (
+            self.reply_markup.model_dump_json()
+            if self.reply_markup is not None
+            else ""
+        )
+
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+class EditQueue:
+    def __init__(
+        self,
+        bot: aiogram.Bot,
+        rate_limiter: TokenBucket,
+        concurrency: int = 8,
+        max_backoff: float = 60.00,
+    ) -> None:
+        self.bot = bot
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.max_backoff = max_backoff
+
+        self.sent = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self.failed = 0
+
+        self._digests: dict[tuple[int, int], str] = {}
+        self._pending: dict[int, dict[int, Edit]] = {}
+        self._chats: collections.deque[int] = collections.deque()
+        self._busy_chats: set[int] = set()
+        self._backoff: dict[int, float] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return sum(len(chat_edits) for chat_edits in self._pending.values())
+
+    def submit(self, edit: Edit) -> bool:
+        if self._digests.get(edit.target) == edit.digest:
+            self.skipped += 1
+            self._discard(edit.target)
+            return False
+
+        if edit.message_id in self._pending.get(edit.chat_id, {}):
+            self.coalesced += 1
+
+        self._enqueue(edit)
+
+        if not self.running:
+            self._task = asyncio.create_task(self._drain())
+
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "coalesced": self.coalesced,
+            "throttled": self.throttled,
+            "failed": self.failed,
+            "pending": len(self),
+        }
+
+    async def join(self) -> None:
+        if self.running:
+            await asyncio.shield(self._task)
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def send(self, edit: Edit) -> None:
+        await self.bot.edit_message_text(
+            text=edit.text,
+            chat_id=edit.chat_id,
+            message_id=edit.message_id,
+            reply_markup=edit.reply_markup,
+        )
+
+    def _enqueue(self, edit: Edit, replace: bool = True) -> None:
+        if edit.chat_id not in self._pending:
+            self._pending[edit.chat_id] = {}
+            self._chats.append(edit.chat_id)
+
+        if replace:
+            self._pending[edit.chat_id][edit.message_id] = edit
+            return None
+
+        self._pending[edit.chat_id].setdefault(edit.message_id, edit)
+
+    def _discard(self, target: tuple[int, int]) -> None:
+        chat_id, message_id = target
+        chat_edits = self._pending.get(chat_id, {})
+        chat_edits.pop(message_id, None)
+
+        if chat_id in self._pending and len(chat_edits) == 0:
+            del self._pending[chat_id]
+            self._chats.remove(chat_id)
+
+    def _next_edit(self) -> Edit | None:
+        for _ in range(len(self._chats)):
+            chat_id = self._chats.popleft()
+
+            if chat_id in self._busy_chats:
+                self._chats.append(chat_id)
+                continue
+
+            chat_edits = self._pending[chat_id]
+            edit = chat_edits.pop(next(iter(chat_edits)))
+
+            if len(chat_edits) > 0:
+                self._chats.append(chat_id)
+
+            else:
+                del self._pending[chat_id]
+
+            return edit
+
+        return None
+
+    async def _drain(self) -> None:
+        in_flight: set[asyncio.Task] = set()
+
+        try:
+            while len(self._pending) > 0 or len(in_flight) > 0:
+                edit = (
+                    self._next_edit()
+                    if len(in_flight) < self.concurrency
+                    else None
+                )
+
+                if edit is None:
+                    _, in_flight = await asyncio.wait(
+                        in_flight,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    continue
+
+                self._busy_chats.add(edit.chat_id)
+                await self.rate_limiter.acquire()
+                in_flight.add(asyncio.create_task(self._deliver(edit)))
+
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _deliver(self, edit: Edit) -> None:
+        try:
+            await self.send(edit)
+
+        except TelegramRetryAfter as e:
+            self.throttled += 1
+            self._enqueue(edit, replace=False)
+            backoff = min(
+                max(self._backoff.get(edit.chat_id, 0.00) * 2, 1.00),
+                self.max_backoff,
+            )
+            self._backoff[edit.chat_id] = backoff
+            logger.warning(
+                f"Telegram edit to chat {edit.chat_id} throttled,"
+                f" retry after {e.retry_after + backoff:.0f} secs"
+            )
+            await asyncio.sleep(e.retry_after + backoff)
+            return None
+
+        except TelegramBadRequest as e:
+            if "message is not modified" not in e.message:
+                self.failed += 1
+                logger.error(e.__repr__())
+                return None
+
+            self.skipped += 1
+            self._digests[edit.target] = edit.digest
+            return None
+
+        except Exception as e:
+            self.failed += 1
+            logger.error(e.__repr__())
+            return None
+
+        finally:
+            self._busy_chats.discard(edit.chat_id)
+
+        self._backoff.pop(edit.chat_id, None)
+        self.sent += 1
+        self._digests[edit.target] = edit.digest
+
+
+edit_queue = EditQueue(
+    bot,
+    rate_limiter=TokenBucket(rate=Telegram.requests_per_second.to_int()),
+    concurrency=Telegram.max_concurrency.to_int(),
+)
@@ -1,21 +1,20 @@
 import asyncio
 import time
 
-import aiocron
 from loguru import logger
 
-from core import data, database, telegram
-from tasks import coins, portfolio, telegram
-from utils import crontab, tasks
+from core import coingecko, data, database, events, telegram
+from tasks import coins, equity, portfolio, telegram
+from utils import scheduler, tasks
 
 loop = asyncio.new_event_loop()
 asyncio.set_event_loop(loop)
 
 
-@aiocron.crontab(
-    spec=crontab.generate_expression(
-        interval_seconds=data.Config.market_data_update_interval.to_int(),
-    ),
+@scheduler.interval(
+    seconds=data.Config.market_data_update_interval.to_int(),
+    jitter=data.Config.scheduler_jitter.to_int(),
+    overlap=scheduler.SKIP,
     loop=loop,
 )
 @tasks.log
@@ -23,40 +22,61 @@ async def update_market_data_task() -> None:
     return await coins.update_market_data()
 
 
-@aiocron.crontab(
-    spec=crontab.generate_expression(
-        interval_seconds=data.Config.telegram_message_update_interval.to_int(),
-    ),
+@scheduler.interval(
+    seconds=data.Config.hot_data_update_interval.to_int(),
+    jitter=data.Config.scheduler_jitter.to_int(),
+    overlap=scheduler.SKIP,
     loop=loop,
 )
 @tasks.log
-async def update_channel_message_task() -> None:
-    return await telegram.update_channel_message()
+async def update_hot_market_data_task() -> None:
+    return await coins.update_hot_market_data()
 
 
-@aiocron.crontab(
-    spec=crontab.generate_expression(
-        interval_seconds=data.Config.market_data_update_interval.to_int()
-    ),
+@scheduler.interval(
+    seconds=data.Config.equity_rollup_interval.to_int(),
+    jitter=data.Config.scheduler_jitter.to_int(),
+    overlap=scheduler.SKIP,
     loop=loop,
 )
 @tasks.log
-async def update_portfolio_stats_task() -> None:
+async def rollup_equity_task() -> None:
+    return await equity.rollup_equity()
+
+
+@events.bus.subscribe(events.MARKET_SWEEP)
+@tasks.log
+async def add_new_coins_task(version: int) -> None:
+    return await portfolio.add_new_coins()
+
+
+@events.bus.subscribe(events.MARKET_SNAPSHOT)
+@tasks.log
+async def update_portfolio_stats_task(version: int) -> None:
     return await portfolio.update_stats()
 
 
+@events.bus.subscribe(
+    events.PORTFOLIO_REVALUED,
+    min_interval=data.Config.telegram_message_update_interval.to_int(),
+)
+@tasks.log
+async def update_channel_message_task(version: int) -> None:
+    return await telegram.update_channel_message()
+
+
 async def main() -> None:
     logger.info("Created by lalka2003")
 
+    await database.async_create_all()
+
     database_session = database.async_session()
     database_connection = database_session.is_active
     await database_session.close()
     logger.info(f"Database connected: {database_connection}")
 
-    telegram_channel = await telegram.bot.get_chat(
-        chat_id=data.Telegram.channel_id.to_int(),
-    )
-    logger.info(f"Telegram channel: @{telegram_channel.username}")
+    for telegram_channel in await telegram.load_channels():
+        logger.info(f"Telegram channel: @{telegram_channel.username}")
 
     data.Config.__log_repr__(logger)
     data.CoinGecko.__log_repr__(logger)
@@ -69,5 +89,21 @@ async def main() -> None:
         await asyncio.sleep(1.00)
 
 
+async def shutdown() -> None:
+    update_market_data_task.stop()
+    update_hot_market_data_task.stop()
+    rollup_equity_task.stop()
+    events.bus.cancel()
+    telegram.edit_queue.cancel()
+
+    await coingecko.client.close()
+    await telegram.bot.session.close()
+    logger.info("Tracker stopped")
+
+
 if __name__ == "__main__":
-    loop.run_until_complete(main())
+    try:
+        loop.run_until_complete(main())
+
+    finally:
+        loop.run_until_complete(shutdown())
@@ -1,25 +1,107 @@
+import contextlib
+from typing import AsyncIterator
+
 from loguru import logger
 import sqlalchemy
 from sqlalchemy.dialects import sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 
 class BaseController:
     def __init__(self, session: AsyncSession) -> None:
         self.session: AsyncSession = session
 
+    @property
+    def in_transaction(self) -> bool:
+        return self.session.info.get("transaction_depth", 0) > 0
+
+    @contextlib.asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncSession]:
+        transaction_depth = self.session.info.get("transaction_depth", 0)
+        self.session.info["transaction_depth"] = transaction_depth + 1
+
+        try:
+            yield self.session
+
+            if transaction_depth == 0:
+                await self.flush_queries()
+                await self.session.commit()
+
+        except BaseException:
+            if transaction_depth == 0:
+                self.session.info.pop("pending_queries", None)
+                await self.session.rollback()
+
+            raise
+
+        finally:
+            self.session.info["transaction_depth"] = transaction_depth
+
+    async def commit(self) -> None:
+        if self.in_transaction:
+            return None
+
+        await self.flush_queries()
+        await self.session.commit()
+
+    async def flush_queries(self) -> None:
+        queries = self.session.info.pop("pending_queries", [])
+
+        if len(queries) == 0:
+            return None
+
+        def execute(session: Session) -> None:
+            for query, params in queries:
+                if isinstance(query, str):
+                    session.connection().exec_driver_sql(query, params)
+                    continue
+
+                session.execute(statement=query, params=params)
+
+        await self.session.run_sync(execute)
+
+    async def defer_query(
+        self,
+        query: sqlalchemy.Executable | str,
+        params: list[dict] | list[tuple] | dict | None = None,
+    ) -> None:
+        if not self.in_transaction:
+            if isinstance(query, str):
+                await self.custom_driver_query(query, params)
+                return None
+
+            await self.custom_query(query, params)
+            return None
+
+        self.session.info.setdefault("pending_queries", []).append(
+            (query, params)
+        )
+
     async def custom_query(
         self,
         query: sqlalchemy.Executable,
         params: list[dict] | dict | None = None,
         execution_options: dict | None = None,
     ) -> sqlalchemy.Result:
+        await self.flush_queries()
+
         return await self.session.execute(
             statement=query,
             params=params,
             execution_options=execution_options,
         )
 
+    async def custom_driver_query(
+        self,
+        query: str,
+        params: list[tuple] | tuple | None = None,
+    ) -> sqlalchemy.CursorResult:
+        await self.flush_queries()
+        connection = await self.session.connection()
+
+        return await connection.exec_driver_sql(query, params)
+
     async def custom_logged_query(
         self,
         query: sqlalchemy.Executable,
@@ -0,0 +1,161 @@
+import datetime
+
+import sqlalchemy
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.controllers.base import BaseController
+from models.equity import PortfolioCandlesDatabase, PortfolioEquityDatabase
+
+
+class EquityController(BaseController):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session)
+
+    async def get_points(
+        self,
+        since: datetime.datetime | None = None,
+    ) -> list[sqlalchemy.Row]:
+        query = select(
+            PortfolioEquityDatabase.portfolio_id,
+            PortfolioEquityDatabase.created_at.label("opened_at"),
+            PortfolioEquityDatabase.quote_value.label("open"),
+            PortfolioEquityDatabase.quote_value.label("high"),
+            PortfolioEquityDatabase.quote_value.label("low"),
+            PortfolioEquityDatabase.quote_value.label("close"),
+            PortfolioEquityDatabase.quote_value_invested,
+            literal(1).label("points"),
+        ).order_by(
+            PortfolioEquityDatabase.portfolio_id,
+            PortfolioEquityDatabase.created_at,
+        )
+
+        if since is not None:
+            query = query.where(PortfolioEquityDatabase.created_at >= since)
+
+        result = await self.custom_query(query)
+
+        return result.all()
+
+    async def create_points(self, points: list[dict]) -> int:
+        if len(points) == 0:
+            return 0
+
+        await self.defer_query(
+            insert(PortfolioEquityDatabase.__table__),
+            points,
+        )
+
+        await self.commit()
+
+        return len(points)
+
+    async def delete_points(self, before: datetime.datetime) -> int:
+        query = delete(PortfolioEquityDatabase).where(
+            PortfolioEquityDatabase.created_at < before
+        )
+        result = await self.custom_query(query)
+
+        await self.commit()
+
+        return result.rowcount
+
+    async def get_candles(
+        self,
+        interval: str,
+        portfolio_id: str | None = None,
+        since: datetime.datetime | None = None,
+    ) -> list[sqlalchemy.Row]:
+        query = (
+            select(
+                PortfolioCandlesDatabase.portfolio_id,
+                PortfolioCandlesDatabase.opened_at,
+                PortfolioCandlesDatabase.open,
+                PortfolioCandlesDatabase.high,
+                PortfolioCandlesDatabase.low,
+                PortfolioCandlesDatabase.close,
+                PortfolioCandlesDatabase.quote_value_invested,
+                PortfolioCandlesDatabase.points,
+            )
+            .where(PortfolioCandlesDatabase.interval == interval)
+            .order_by(
+                PortfolioCandlesDatabase.portfolio_id,
+                PortfolioCandlesDatabase.opened_at,
+            )
+        )
+
+        if portfolio_id is not None:
+            query = query.where(
+                PortfolioCandlesDatabase.portfolio_id == portfolio_id
+            )
+
+        if since is not None:
+            query = query.where(PortfolioCandlesDatabase.opened_at >= since)
+
+        result = await self.custom_query(query)
+
+        return result.all()
+
+    async def get_last_candle_at(
+        self,
+        interval: str,
+        portfolio_id: str | None = None,
+    ) -> datetime.datetime | None:
+        query = select(func.max(PortfolioCandlesDatabase.opened_at)).where(
+            PortfolioCandlesDatabase.interval == interval
+        )
+
+        if portfolio_id is not None:
+            query = query.where(
+                PortfolioCandlesDatabase.portfolio_id == portfolio_id
+            )
+
+        result = await self.custom_query(query)
+
+        return result.scalar_one_or_none()
+
+    async def upsert_candles(self, candles: list[dict]) -> int:
+        if len(candles) == 0:
+            return 0
+
+        query = sqlite.insert(PortfolioCandlesDatabase.__table__)
+        query = query.on_conflict_do_update(
+            index_elements=[
+                PortfolioCandlesDatabase.portfolio_id,
+                PortfolioCandlesDatabase.interval,
+                PortfolioCandlesDatabase.opened_at,
+            ],
+            set_={
+                name: query.excluded[name]
+                for name in (
+                    "open",
+                    "high",
+                    "low",
+                    "close",
+                    "quote_value_invested",
+                    "points",
+                )
+            },
+        )
+        await self.defer_query(query, candles)
+
+        await self.commit()
+
+        return len(candles)
+
+    async def delete_candles(
+        self,
+        interval: str,
+        before: datetime.datetime,
+    ) -> int:
+        query = (
+            delete(PortfolioCandlesDatabase)
+            .where(PortfolioCandlesDatabase.interval == interval)
+            .where(PortfolioCandlesDatabase.opened_at < before)
+        )
+        result = await self.custom_query(query)
+
+        await self.commit()
+
+        return result.rowcount
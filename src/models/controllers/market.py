@@ -1,7 +1,6 @@
-import datetime
-
 import sqlalchemy
-from sqlalchemy import desc, insert, select, update, bindparam
+from sqlalchemy import bindparam, desc, select
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.controllers.base import BaseController
@@ -20,125 +19,76 @@ class MarketCoinsController(BaseController):
 
         return result.scalars().all()
 
-    async def get_by_id(self, id: str) -> MarketCoinsDatabase | None:
-        query = select(MarketCoinsDatabase).where(MarketCoinsDatabase.id == id)
+    async def count(self) -> int:
+        query = select(sqlalchemy.func.count(MarketCoinsDatabase.id))
         result = await self.custom_query(query)
 
-        return result.scalars().one_or_none()
+        return result.scalar_one()
 
-    async def create(
-        self,
-        id: str,
-        symbol: str,
-        current_price: float,
-        market_cap: int,
-        price_change_24h: float,
-        price_change_percentage_24h: float,
-        market_cap_change_24h: int,
-        market_cap_change_percentage_24h: float,
-        ath: float,
-        ath_change_percentage: float,
-        ath_date: datetime.datetime,
-        atl: float,
-        atl_change_percentage: float,
-        atl_date: datetime.datetime,
-    ) -> str:
-        query = (
-            insert(MarketCoinsDatabase)
-            .values(
-                id=id,
-                symbol=symbol,
-                current_price=current_price,
-                market_cap=market_cap,
-                price_change_24h=price_change_24h,
-                price_change_percentage_24h=price_change_percentage_24h,
-                market_cap_change_24h=market_cap_change_24h,
-                market_cap_change_percentage_24h=market_cap_change_percentage_24h,
-                ath=ath,
-                ath_change_percentage=ath_change_percentage,
-                ath_date=ath_date,
-                atl=atl,
-                atl_change_percentage=atl_change_percentage,
-                atl_date=atl_date,
-                created_at=datetime.datetime.now(),
-                updated_at=datetime.datetime.now(),
-            )
-            .returning(MarketCoinsDatabase.id)
-        )
+    async def get_all_quotes(self) -> list[sqlalchemy.Row]:
+        query = select(
+            MarketCoinsDatabase.id,
+            MarketCoinsDatabase.symbol,
+            MarketCoinsDatabase.current_price,
+            MarketCoinsDatabase.market_cap,
+        ).order_by(desc(MarketCoinsDatabase.market_cap))
         result = await self.custom_query(query)
 
-        await self.session.commit()
-
-        return result.scalars().first()
-
-    async def update(
-        self,
-        id: str,
-        symbol: str | None = None,
-        current_price: float | None = None,
-        market_cap: int | None = None,
-        price_change_24h: float | None = None,
-        price_change_percentage_24h: float | None = None,
-        market_cap_change_24h: int | None = None,
-        market_cap_change_percentage_24h: float | None = None,
-        ath: float | None = None,
-        ath_change_percentage: float | None = None,
-        ath_date: datetime.datetime | None = None,
-        atl: float | None = None,
-        atl_change_percentage: float | None = None,
-        atl_date: datetime.datetime | None = None,
-    ) -> MarketCoinsDatabase:
-        values: dict = {"updated_at": datetime.datetime.now()}
-
-        if symbol is not None:
-            values["symbol"] = symbol
-
-        if current_price is not None:
-            values["current_price"] = current_price
-
-        if market_cap is not None:
-            values["market_cap"] = market_cap
-
-        if price_change_24h is not None:
-            values["price_change_24h"] = price_change_24h
-
-        if price_change_percentage_24h is not None:
-            values["price_change_percentage_24h"] = price_change_percentage_24h
-
-        if market_cap_change_24h is not None:
-            values["market_cap_change_24h"] = market_cap_change_24h
-
-        if market_cap_change_percentage_24h is not None:
-            values["market_cap_change_percentage_24h"] = (
-                market_cap_change_percentage_24h
-            )
-
-        if ath is not None:
-            values["ath"] = ath
+        return result.all()
 
-        if ath_change_percentage is not None:
-            values["ath_change_percentage"] = ath_change_percentage
+    async def get_quotes(self, ids: list[str]) -> list[sqlalchemy.Row]:
+        query = select(
+            MarketCoinsDatabase.id,
+            MarketCoinsDatabase.symbol,
+            MarketCoinsDatabase.current_price,
+            MarketCoinsDatabase.market_cap,
+        ).where(MarketCoinsDatabase.id.in_(ids))
+        result = await self.custom_query(query)
 
-        if ath_date is not None:
-            values["ath_date"] = ath_date
+        return result.all()
 
-        if atl is not None:
-            values["atl"] = atl
+    async def get_by_id(self, id: str) -> MarketCoinsDatabase | None:
+        query = select(MarketCoinsDatabase).where(MarketCoinsDatabase.id == id)
+        result = await self.custom_query(query)
 
-        if atl_change_percentage is not None:
-            values["atl_change_percentage"] = atl_change_percentage
+        return result.scalars().one_or_none()
 
-        if atl_date is not None:
-            values["atl_date"] = atl_date
+    async def upsert_many(self, coins: list[tuple]) -> int:
+        if len(coins) == 0:
+            return 0
+
+        result = await self.custom_driver_query(upsert_query, coins)
+
+        await self.commit()
+
+        return result.rowcount
+
+
+def compile_upsert_query() -> str:
+    columns = MarketCoinsDatabase.__table__.columns
+    query = sqlite.insert(MarketCoinsDatabase.__table__).values(
+        {column: bindparam(column.name) for column in columns}
+    )
+    mutable_columns = [
+        column
+        for column in columns
+        if column.name not in ("id", "created_at", "updated_at")
+    ]
+    query = query.on_conflict_do_update(
+        index_elements=[MarketCoinsDatabase.id],
+        set_={
+            column.name: query.excluded[column.name]
+            for column in [*mutable_columns, columns.updated_at]
+        },
+        where=sqlalchemy.or_(
+            *(
+                column.is_distinct_from(query.excluded[column.name])
+                for column in mutable_columns
+            )
+        ),
+    )
 
-        query = (
-            update(MarketCoinsDatabase)
-            .where(MarketCoinsDatabase.id == id)
-            .values(**values)
-            .returning(MarketCoinsDatabase)
-        )
-        result = await self.custom_query(query)
+    return str(query.compile(dialect=sqlite.dialect()))
 
-        await self.session.commit()
 
-        return result.scalars().first()
+upsert_query = compile_upsert_query()
@@ -2,22 +2,46 @@ import datetime
 import uuid
 
 import sqlalchemy
-from sqlalchemy import asc, desc, insert, select, update, and_
+from sqlalchemy import (
+    String,
+    and_,
+    asc,
+    bindparam,
+    desc,
+    exists,
+    insert,
+    literal,
+    select,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import subqueryload
 
+from core.leaderboard import RANKS
 from models.controllers.base import BaseController
+from models.market import MarketCoinsDatabase
 from models.portfolio import PortfolioCoinsDatabase, PortfolioDatabase
 
+random_uuid4 = sqlalchemy.literal_column(
+    "lower(hex(randomblob(4))) || '-' || lower(hex(randomblob(2)))"
+    " || '-4' || substr(lower(hex(randomblob(2))), 2)"
+    " || '-' || substr('89ab', abs(random()) % 4 + 1, 1)"
+    " || substr(lower(hex(randomblob(2))), 2)"
+    " || '-' || lower(hex(randomblob(6)))",
+    String,
+)
+
 
 class PortfolioController(BaseController):
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session)
 
-    async def get_all(self) -> list[PortfolioDatabase]:
-        query = select(PortfolioDatabase).options(
-            subqueryload(PortfolioDatabase.coins)
-        )
+    async def get_all(self, coins: bool = True) -> list[PortfolioDatabase]:
+        query = select(PortfolioDatabase)
+
+        if coins:
+            query = query.options(subqueryload(PortfolioDatabase.coins))
+
         result = await self.custom_query(query)
 
         return result.scalars().all()
@@ -33,20 +57,17 @@ class PortfolioController(BaseController):
         return result.scalars().one_or_none()
 
     async def create(self) -> str:
-        query = (
-            insert(PortfolioDatabase)
-            .values(
-                id=str(uuid.uuid4()),
-                created_at=datetime.datetime.now(),
-                updated_at=datetime.datetime.now(),
-            )
-            .returning(PortfolioDatabase.id)
+        id = str(uuid.uuid4())
+        query = insert(PortfolioDatabase).values(
+            id=id,
+            created_at=datetime.datetime.now(),
+            updated_at=datetime.datetime.now(),
         )
-        result = await self.custom_query(query)
+        await self.defer_query(query)
 
-        await self.session.commit()
+        await self.commit()
 
-        return result.scalars().first()
+        return id
 
     async def update(
         self,
@@ -98,17 +119,79 @@ class PortfolioController(BaseController):
             update(PortfolioDatabase)
             .where(PortfolioDatabase.id == id)
             .values(**values)
-            .returning(PortfolioDatabase.id)
         )
-        result = await self.custom_query(query)
+        await self.defer_query(query)
+
+        await self.commit()
+
+        return id
+
+    async def add_quote_value(
+        self,
+        quote_values: dict[str, float],
+    ) -> list[str]:
+        if len(quote_values) == 0:
+            return []
+
+        query = (
+            update(PortfolioDatabase.__table__)
+            .where(PortfolioDatabase.id == bindparam("portfolio_pk"))
+            .values(
+                quote_value=(
+                    PortfolioDatabase.quote_value + bindparam("added")
+                ),
+                quote_value_invested=(
+                    PortfolioDatabase.quote_value_invested + bindparam("added")
+                ),
+                updated_at=datetime.datetime.now(),
+            )
+        )
+        await self.defer_query(
+            query,
+            [
+                {"portfolio_pk": id, "added": quote_value}
+                for id, quote_value in quote_values.items()
+            ],
+        )
 
-        await self.session.commit()
+        await self.commit()
 
-        return result.scalars().first()
+        return list(quote_values.keys())
 
     async def get_coins(self) -> PortfolioCoinsDatabase | None:
         query = select(PortfolioCoinsDatabase)
-        result = await self.session.execute(query)
+        result = await self.custom_query(query)
+
+        return result.scalars().all()
+
+    async def get_coins_holdings(self) -> list[sqlalchemy.Row]:
+        query = select(
+            PortfolioCoinsDatabase.id,
+            PortfolioCoinsDatabase.portfolio_id,
+            PortfolioCoinsDatabase.coin_id,
+            PortfolioCoinsDatabase.quantity,
+            PortfolioCoinsDatabase.quote_value_invested,
+            PortfolioCoinsDatabase.quote_value,
+            PortfolioCoinsDatabase.quote_value_ath,
+            PortfolioCoinsDatabase.quote_value_atl,
+            PortfolioCoinsDatabase.pnl_percentage,
+            PortfolioCoinsDatabase.pnl_percentage_ath,
+            PortfolioCoinsDatabase.pnl_percentage_atl,
+            PortfolioCoinsDatabase.pnl_quote_value,
+            PortfolioCoinsDatabase.pnl_quote_value_ath,
+            PortfolioCoinsDatabase.pnl_quote_value_atl,
+        )
+        result = await self.custom_query(query)
+
+        return result.all()
+
+    async def get_coin_ids(self, portfolio_id: uuid.UUID) -> list[str]:
+        query = (
+            select(PortfolioCoinsDatabase.coin_id)
+            .where(PortfolioCoinsDatabase.portfolio_id == portfolio_id)
+            .order_by(desc(PortfolioCoinsDatabase.quote_value))
+        )
+        result = await self.custom_query(query)
 
         return result.scalars().all()
 
@@ -137,31 +220,36 @@ class PortfolioController(BaseController):
 
         return result.scalars().one_or_none()
 
+    @staticmethod
+    def rank_column(rank_by: str) -> sqlalchemy.Column:
+        if rank_by not in RANKS:
+            raise ValueError(f"Unknown rank: {rank_by}")
+
+        return getattr(PortfolioCoinsDatabase, rank_by)
+
     async def get_coin_gainers(
         self,
         portfolio_id: uuid.UUID,
         limit: int = 10,
+        rank_by: str = "quote_value",
     ) -> list[PortfolioCoinsDatabase]:
         query = (
             select(PortfolioCoinsDatabase)
             .where(
                 PortfolioCoinsDatabase.portfolio_id == portfolio_id,
             )
-            .order_by(desc(PortfolioCoinsDatabase.quote_value))
+            .order_by(desc(self.rank_column(rank_by)))
             .limit(limit)
         )
         result = await self.custom_query(query)
 
-        return sorted(
-            result.scalars().all(),
-            key=(lambda k: k.quote_value),
-            reverse=True,
-        )
+        return result.scalars().all()
 
     async def get_coin_losers(
         self,
         portfolio_id: uuid.UUID,
         limit: int = 10,
+        rank_by: str = "quote_value",
     ) -> list[PortfolioCoinsDatabase]:
         query = (
             select(PortfolioCoinsDatabase)
@@ -171,16 +259,12 @@ class PortfolioController(BaseController):
                     PortfolioCoinsDatabase.pnl_percentage > -99,
                 )
             )
-            .order_by(asc(PortfolioCoinsDatabase.quote_value))
+            .order_by(asc(self.rank_column(rank_by)))
             .limit(limit)
         )
         result = await self.custom_query(query)
 
-        return sorted(
-            result.scalars().all(),
-            key=(lambda k: k.quote_value),
-            reverse=False,
-        )
+        return result.scalars().all()
 
     async def create_coin(
         self,
@@ -189,45 +273,132 @@ class PortfolioController(BaseController):
         quantity: int | float,
         quote_value: int | float,
     ) -> str:
-        query = (
-            insert(PortfolioCoinsDatabase)
-            .values(
-                id=str(uuid.uuid4()),
-                portfolio_id=portfolio_id,
-                coin_id=coin_id,
-                quantity=quantity,
-                quantity_ath=quantity,
-                quantity_atl=quantity,
-                quote_value=quote_value,
-                quote_value_ath=quote_value,
-                quote_value_atl=quote_value,
-                quote_value_invested=quote_value,
-                created_at=datetime.datetime.now(),
-                updated_at=datetime.datetime.now(),
-            )
-            .returning(PortfolioCoinsDatabase.id)
+        id = str(uuid.uuid4())
+        query = insert(PortfolioCoinsDatabase).values(
+            id=id,
+            portfolio_id=portfolio_id,
+            coin_id=coin_id,
+            quantity=quantity,
+            quantity_ath=quantity,
+            quantity_atl=quantity,
+            quote_value=quote_value,
+            quote_value_ath=quote_value,
+            quote_value_atl=quote_value,
+            quote_value_invested=quote_value,
+            created_at=datetime.datetime.now(),
+            updated_at=datetime.datetime.now(),
         )
-        result = await self.custom_query(query)
+        await self.defer_query(query)
 
-        await self.session.commit()
+        await self.commit()
 
-        return result.scalars().first()
+        return id
 
     async def create_coins(
         self,
         portfolio_id: uuid.UUID,
         coins: list[dict],
     ) -> list[str]:
+        if len(coins) == 0:
+            return []
+
+        now = datetime.datetime.now()
+        values = [
+            {
+                "id": str(uuid.uuid4()),
+                "portfolio_id": portfolio_id,
+                "coin_id": coin["coin_id"],
+                "quantity": coin["quantity"],
+                "quantity_ath": coin["quantity"],
+                "quantity_atl": coin["quantity"],
+                "quote_value": coin["quote_value"],
+                "quote_value_ath": coin["quote_value"],
+                "quote_value_atl": coin["quote_value"],
+                "quote_value_invested": coin["quote_value"],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for coin in coins
+        ]
+        await self.defer_query(insert(PortfolioCoinsDatabase), values)
+
+        await self.commit()
+
+        return [value["id"] for value in values]
+
+    async def create_missing_coins(
+        self,
+        quote_value: float,
+    ) -> list[sqlalchemy.Row]:
+        now = datetime.datetime.now()
+        missing_coins = (
+            select(
+                PortfolioDatabase.id.label("portfolio_id"),
+                MarketCoinsDatabase.id.label("coin_id"),
+                (
+                    literal(quote_value) / MarketCoinsDatabase.current_price
+                ).label("quantity"),
+                MarketCoinsDatabase.current_price,
+            )
+            .join(MarketCoinsDatabase, sqlalchemy.true())
+            .where(MarketCoinsDatabase.current_price > 0)
+            .where(
+                ~exists().where(
+                    PortfolioCoinsDatabase.portfolio_id
+                    == PortfolioDatabase.id,
+                    PortfolioCoinsDatabase.coin_id == MarketCoinsDatabase.id,
+                )
+            )
+            .subquery()
+        )
+        missing_coins_quote_value = (
+            missing_coins.c.quantity * missing_coins.c.current_price
+        )
         query = (
             insert(PortfolioCoinsDatabase)
-            .values(coins)
-            .returning(PortfolioCoinsDatabase.id)
+            .from_select(
+                [
+                    "id",
+                    "portfolio_id",
+                    "coin_id",
+                    "quantity",
+                    "quantity_ath",
+                    "quantity_atl",
+                    "quote_value",
+                    "quote_value_ath",
+                    "quote_value_atl",
+                    "quote_value_invested",
+                    "created_at",
+                    "updated_at",
+                ],
+                select(
+                    random_uuid4,
+                    missing_coins.c.portfolio_id,
+                    missing_coins.c.coin_id,
+                    missing_coins.c.quantity,
+                    missing_coins.c.quantity,
+                    missing_coins.c.quantity,
+                    missing_coins_quote_value,
+                    missing_coins_quote_value,
+                    missing_coins_quote_value,
+                    missing_coins_quote_value,
+                    literal(now, PortfolioCoinsDatabase.created_at.type),
+                    literal(now, PortfolioCoinsDatabase.updated_at.type),
+                ),
+            )
+            .returning(
+                PortfolioCoinsDatabase.id,
+                PortfolioCoinsDatabase.portfolio_id,
+                PortfolioCoinsDatabase.coin_id,
+                PortfolioCoinsDatabase.quote_value,
+            )
         )
         result = await self.custom_query(query)
+        coins = result.all()
 
-        await self.session.commit()
+        await self.commit()
 
-        return result.scalars().first()
+        return coins
 
     async def update_coin(
         self,
@@ -291,27 +462,36 @@ class PortfolioController(BaseController):
             update(PortfolioCoinsDatabase)
             .where(PortfolioCoinsDatabase.id == id)
             .values(**values)
-            .returning(PortfolioCoinsDatabase.id)
         )
-        result = await self.custom_query(query)
+        await self.defer_query(query)
 
-        await self.session.commit()
+        await self.commit()
 
-        return result.scalars().first()
+        return id
 
     async def update_coins(
         self,
         portfolio_id: uuid.UUID,
         coins: list[dict],
     ) -> list[str]:
+        if len(coins) == 0:
+            return []
+
+        now = datetime.datetime.now()
         query = (
-            update(PortfolioCoinsDatabase)
+            update(PortfolioCoinsDatabase.__table__)
+            .where(PortfolioCoinsDatabase.id == bindparam("coin_pk"))
             .where(PortfolioCoinsDatabase.portfolio_id == portfolio_id)
-            .values(coins)
-            .returning(PortfolioCoinsDatabase.id)
         )
-        result = await self.custom_query(query)
+        await self.defer_query(
+            query,
+            [
+                {"coin_pk": coin["id"], "updated_at": now}
+                | {key: value for key, value in coin.items() if key != "id"}
+                for coin in coins
+            ],
+        )
 
-        await self.session.commit()
+        await self.commit()
 
-        return result.scalars().all()
+        return [coin["id"] for coin in coins]
@@ -0,0 +1,52 @@
+import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import mapped_column
+
+from core.database import Base
+
+# stupid solution for sqlalchemy.exc.NoReferencedTableError
+from models.portfolio import PortfolioDatabase
+
+
+class PortfolioEquityDatabase(Base):
+    __tablename__ = "portfolio_equity"
+    __table_args__ = (
+        Index(
+            "ix_portfolio_equity_portfolio_id_created_at",
+            "portfolio_id",
+            "created_at",
+        ),
+    )
+
+    id = mapped_column(Integer, primary_key=True, autoincrement=True)
+    portfolio_id = mapped_column(
+        String,
+        ForeignKey("portfolio.id"),
+        nullable=False,
+    )
+    quote_value = mapped_column(Float, nullable=False)
+    quote_value_invested = mapped_column(Float, nullable=False)
+    created_at = mapped_column(
+        DateTime,
+        nullable=False,
+        default=datetime.datetime.now,
+    )
+
+
+class PortfolioCandlesDatabase(Base):
+    __tablename__ = "portfolio_candles"
+
+    portfolio_id = mapped_column(
+        String,
+        ForeignKey("portfolio.id"),
+        primary_key=True,
+    )
+    interval = mapped_column(String, primary_key=True)
+    opened_at = mapped_column(DateTime, primary_key=True)
+    open = mapped_column(Float, nullable=False)
+    high = mapped_column(Float, nullable=False)
+    low = mapped_column(Float, nullable=False)
+    close = mapped_column(Float, nullable=False)
+    quote_value_invested = mapped_column(Float, nullable=False)
+    points = mapped_column(Integer, nullable=False)
@@ -1,7 +1,7 @@
 import datetime
 import uuid
 
-from sqlalchemy import DateTime, Float, ForeignKey, String
+from sqlalchemy import DateTime, Float, ForeignKey, Index, String
 from sqlalchemy.orm import column_property, mapped_column, relationship
 
 from core.database import Base
@@ -48,6 +48,23 @@ class PortfolioDatabase(Base):
 
 class PortfolioCoinsDatabase(Base):
     __tablename__ = "portfolio_coins"
+    __table_args__ = (
+        Index(
+            "ix_portfolio_coins_portfolio_id_coin_id",
+            "portfolio_id",
+            "coin_id",
+        ),
+        Index(
+            "ix_portfolio_coins_portfolio_id_quote_value",
+            "portfolio_id",
+            "quote_value",
+        ),
+        Index(
+            "ix_portfolio_coins_portfolio_id_pnl_percentage",
+            "portfolio_id",
+            "pnl_percentage",
+        ),
+    )
 
     id = mapped_column(
         String,
@@ -1,57 +1,102 @@
+import argparse
 import asyncio
-import uuid
+import pathlib
 
-import dotenv
-
-from core.data import Config, Database
+from core import coingecko
+from core.data import Config
 from core.database import async_create_all, async_session
 from models.controllers.market import MarketCoinsController
 from models.controllers.portfolio import PortfolioController
 from tasks.coins import update_market_data
 
 
-async def main() -> None:
-    await async_create_all()
-    await update_market_data(initial=True)
+async def load_snapshot(path: pathlib.Path) -> int:
+    session = async_session()
+    market_controller = MarketCoinsController(session)
+
+    now = coingecko.sqlite_now()
+    min_mcap = Config.min_mcap.to_int()
+    coins_market = [
+        coin_market.to_row(now)
+        for coin_market in coingecko.decode_markets(path.read_bytes())
+        if (coin_market.market_cap or 0) > min_mcap
+    ]
+    await market_controller.upsert_many(coins_market)
+
+    await session.close()
 
+    return len(coins_market)
+
+
+async def create_portfolio() -> str:
     session = async_session()
     portfolio_controller = PortfolioController(session)
     market_controller = MarketCoinsController(session)
 
-    portfolio_id = await portfolio_controller.create()
-    market_coins = await market_controller.get_all()
-
-    Config.portfolio_id.update_env(portfolio_id)
+    market_coins = await market_controller.get_all_quotes()
+    portfolio_coins = []
     total_coin_quote_value = 0.00
 
     for coin in market_coins:
-        coin_portfolio = await portfolio_controller.get_coin_by_coin_id(
-            portfolio_id,
-            coin.id,
+        if not coin.current_price:
+            continue
+
+        coin_quantity = Config.buy_amount.to_float() / coin.current_price
+        coin_quote_value = coin.current_price * coin_quantity
+        total_coin_quote_value += coin_quote_value
+
+        portfolio_coins.append(
+            {
+                "coin_id": coin.id,
+                "quantity": coin_quantity,
+                "quote_value": coin_quote_value,
+            }
         )
 
-        if coin_portfolio is None:
-            coin_quantity = Config.buy_amount.to_float() / coin.current_price
-            coin_quote_value = coin.current_price * coin_quantity
-            total_coin_quote_value += coin_quote_value
-
-            coin_portfolio_id = await portfolio_controller.create_coin(
-                portfolio_id,
-                coin.id,
-                coin_quantity,
-                coin_quote_value,
-            )
-
-    await portfolio_controller.update(
-        id=portfolio_id,
-        quote_value=total_coin_quote_value,
-        quote_value_ath=total_coin_quote_value,
-        quote_value_atl=0.00,
-        quote_value_invested=total_coin_quote_value,
-    )
+    async with portfolio_controller.transaction():
+        portfolio_id = await portfolio_controller.create()
+
+        await portfolio_controller.create_coins(portfolio_id, portfolio_coins)
+        await portfolio_controller.update(
+            id=portfolio_id,
+            quote_value=total_coin_quote_value,
+            quote_value_ath=total_coin_quote_value,
+            quote_value_atl=0.00,
+            quote_value_invested=total_coin_quote_value,
+        )
 
     await session.close()
 
+    return portfolio_id
+
+
+async def bootstrap(snapshot: pathlib.Path | None = None) -> dict:
+    await async_create_all()
+
+    if snapshot is not None:
+        coins = await load_snapshot(snapshot)
+
+    else:
+        coins = (await update_market_data())["coins"]
+
+    return {"coins": coins, "portfolio_id": await create_portfolio()}
+
+
+async def main(snapshot: pathlib.Path | None = None) -> None:
+    prepare_stats = await bootstrap(snapshot)
+    Config.portfolio_id.update_env(prepare_stats["portfolio_id"])
+
+    await coingecko.client.close()
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Prepare database")
+    parser.add_argument(
+        "--snapshot",
+        type=pathlib.Path,
+        default=None,
+        help="seed market coins from a saved /coins/markets response",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(snapshot=args.snapshot))
@@ -0,0 +1,64 @@
+import asyncio
+import datetime
+
+import numpy as np
+
+from core import equity
+from core.analytics import PortfolioAnalytics, analytics
+from core.database import async_session
+from core.history import price_history
+from models.controllers.equity import EquityController
+from models.controllers.portfolio import PortfolioController
+
+
+async def get_portfolio_analytics(portfolio_id: str) -> PortfolioAnalytics:
+    session = async_session()
+    equity_controller = EquityController(session)
+    portfolio_controller = PortfolioController(session)
+
+    last_candle_at = await equity_controller.get_last_candle_at(
+        analytics.interval,
+        portfolio_id=portfolio_id,
+    )
+    coin_ids = await portfolio_controller.get_coin_ids(portfolio_id)
+    key = (last_candle_at, len(coin_ids))
+    cached = analytics.get(portfolio_id, key)
+
+    if cached is not None:
+        await session.close()
+
+        return cached
+
+    candles = await equity_controller.get_candles(
+        analytics.interval,
+        portfolio_id=portfolio_id,
+        since=(
+            datetime.datetime.now()
+            - analytics.lookback
+            * datetime.timedelta(seconds=equity.SECONDS[analytics.interval])
+        ),
+    )
+
+    await session.close()
+
+    closed_at = (
+        np.asarray(
+            [candle.opened_at for candle in candles],
+            dtype=equity.INTERVALS[analytics.interval],
+        )
+        + 1
+    )
+    prices = await asyncio.to_thread(
+        price_history.sample,
+        [analytics.benchmark, *coin_ids],
+        closed_at,
+    )
+
+    return analytics.compute(
+        key=key,
+        portfolio_id=portfolio_id,
+        equity=np.asarray([candle.close for candle in candles]),
+        benchmark=prices[:, 0],
+        coin_ids=coin_ids,
+        prices=prices[:, 1:],
+    )
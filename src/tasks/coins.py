@@ -1,106 +1,237 @@
 import asyncio
-import itertools
+import datetime
 
-import orjson
-import ciso8601
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.coingecko import CoinGeckoV3Client
+from core import events
+from core.coingecko import (
+    MarketPagePlanner,
+    MarketsCoin,
+    client,
+    decode_markets,
+    sqlite_now,
+)
 from core.data import CoinGecko, Config
 from core.database import async_session
+from core.history import price_history
+from core.snapshot import (
+    MarketCoin,
+    MarketSnapshot,
+    hot_coins,
+    market_snapshots,
+)
 from models.controllers.market import MarketCoinsController
 
 
-async def update_market_data(initial: bool = False) -> None:
-    client = CoinGeckoV3Client(api_key=CoinGecko.api_key.to_string())
+async def get_market_snapshot(session: AsyncSession) -> MarketSnapshot:
+    if market_snapshots.current is not None:
+        return market_snapshots.current
+
+    market_coins = await MarketCoinsController(session).get_all_quotes()
+
+    return market_snapshots.publish(
+        MarketCoin.from_row(market_coin) for market_coin in market_coins
+    )
+
+
+async def update_market_data() -> dict:
     session = async_session()
     market_coins_controller = MarketCoinsController(session)
-    market_coins = await market_coins_controller.get_all()
-    coins_pages = (len(market_coins) // 250) + (1 if not initial else 30)
+    market_page_planner = MarketPagePlanner(
+        min_market_cap=Config.min_mcap.to_int(),
+        per_page=250,
+        prefetch=CoinGecko.prefetch_pages.to_int(),
+        max_pages=CoinGecko.max_pages.to_int(),
+    )
+    fetch_workers = CoinGecko.max_concurrency.to_int()
+    coins_market_pages: asyncio.Queue = asyncio.Queue(maxsize=fetch_workers)
+    coins_market_snapshot: list[MarketCoin] = []
+    market_stats = {"pages": 0, "coins": 0, "written": 0}
+
+    async def fetch_market_coins(page: int) -> list[MarketsCoin]:
+        return decode_markets(
+            await (
+                await client.markets(
+                    order="market_cap_desc",
+                    per_page=market_page_planner.per_page,
+                    page=page,
+                )
+            ).read()
+        )
+
+    async def fetch_market_pages() -> None:
+        while (page := await market_page_planner.acquire()) is not None:
+            coins_market = await fetch_market_coins(page)
+            await market_page_planner.complete(page, coins_market)
+            await coins_market_pages.put(coins_market)
+
+    async def produce_market_pages() -> None:
+        try:
+            async with asyncio.TaskGroup() as fetch_tasks:
+                for _ in range(fetch_workers):
+                    fetch_tasks.create_task(fetch_market_pages())
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception:
+            await coins_market_pages.put(None)
+            raise
+
+        await coins_market_pages.put(None)
+
+    producer = asyncio.create_task(produce_market_pages())
+
+    try:
+        while (coins_market := await coins_market_pages.get()) is not None:
+            coins_market = [
+                coin_market
+                for coin_market in coins_market
+                if (coin_market.market_cap or 0) > Config.min_mcap.to_int()
+            ]
+            now = sqlite_now()
 
-    async def fetch_market_coins(page: int) -> list[dict]:
-        async with asyncio.Semaphore(30):
-            return await (await client.markets(per_page=250, page=page)).json(
-                loads=orjson.loads,
+            coins_written = await market_coins_controller.upsert_many(
+                [coin_market.to_row(now) for coin_market in coins_market]
             )
 
-    coins_market_tasks = [
-        asyncio.create_task(fetch_market_coins(coins_page + 1))
-        for coins_page in range(coins_pages)
-    ]
-    coins_market = await asyncio.gather(*coins_market_tasks)
-    coins_market = list(itertools.chain.from_iterable(coins_market))
-    coins_market = [
-        (
-            {
-                "id": coin_market.get("id"),
-                "symbol": coin_market.get("symbol"),
-                "current_price": coin_market.get(
-                    "current_price",
-                    0.00,
-                ),
-                "market_cap": coin_market.get(
-                    "market_cap",
-                    0.00,
-                ),
-                "price_change_24h": coin_market.get(
-                    "price_change_24h",
-                    0.00,
-                ),
-                "price_change_percentage_24h": coin_market.get(
-                    "price_change_percentage_24h",
-                    0.00,
-                ),
-                "market_cap_change_24h": coin_market.get(
-                    "market_cap_change_24h",
-                    0.00,
-                ),
-                "market_cap_change_percentage_24h": coin_market.get(
-                    "market_cap_change_percentage_24h",
-                    0.00,
-                ),
-                "ath": coin_market.get(
-                    "ath",
-                    0.00,
-                ),
-                "ath_change_percentage": coin_market.get(
-                    "ath_change_percentage",
-                    0.00,
-                ),
-                "ath_date": ciso8601.parse_datetime(
-                    coin_market.get("ath_date", "2024-01-01T00:00:00Z"),
-                ),
-                "atl": coin_market.get(
-                    "atl",
-                    0.00,
-                ),
-                "atl_change_percentage": coin_market.get(
-                    "atl_change_percentage",
-                    0.00,
-                ),
-                "atl_date": ciso8601.parse_datetime(
-                    coin_market.get("atl_date", "2024-01-01T00:00:00Z"),
-                ),
-            }
-            if coin_market.get("market_cap", 0.00) > Config.min_mcap.to_int()
-            else {}
+            market_stats["pages"] += 1
+            market_stats["coins"] += len(coins_market)
+            market_stats["written"] += coins_written
+
+            coins_market_snapshot.extend(
+                MarketCoin(
+                    id=coin_market.id,
+                    symbol=coin_market.symbol,
+                    current_price=coin_market.current_price or 0.00,
+                    market_cap=int(coin_market.market_cap or 0),
+                )
+                for coin_market in coins_market
+            )
+
+        await producer
+
+    except Exception:
+        producer.cancel()
+        market_snapshots.invalidate()
+        await session.close()
+        raise
+
+    if market_snapshots.current is None:
+        market_snapshot = await get_market_snapshot(session)
+
+    else:
+        market_snapshot = market_snapshots.publish(
+            coins_market_snapshot,
+            merge=True,
         )
-        for coin_market in coins_market
-    ]
 
-    for coin_market in coins_market:
-        if coin_market.items().__len__() == 0:
-            continue
+    await session.close()
 
-        coin = await market_coins_controller.get_by_id(
-            coin_market.get("id"),
+    try:
+        await asyncio.to_thread(
+            price_history.append,
+            market_snapshot.created_at,
+            [coin.id for coin in coins_market_snapshot],
+            (coin.current_price for coin in coins_market_snapshot),
+            (coin.market_cap for coin in coins_market_snapshot),
         )
 
-        if coin is None:
-            await market_coins_controller.create(**coin_market)
-            continue
+    except Exception as e:
+        logger.error(f"Price history append failed: {e.__repr__()}")
+
+    events.bus.publish(events.MARKET_SWEEP, market_snapshot.version)
 
-        await market_coins_controller.update(**coin_market)
+    return market_stats | {
+        "unchanged": market_stats["coins"] - market_stats["written"],
+        "version": market_snapshot.version,
+    }
+
+
+async def update_hot_market_data() -> dict:
+    hot_coins_ids = hot_coins.ids
+
+    if len(hot_coins_ids) == 0:
+        return {"coins": 0}
+
+    session = async_session()
+    market_coins_controller = MarketCoinsController(session)
+    per_page = 250
+
+    async def fetch_market_coins(ids: tuple[str, ...]) -> list[MarketsCoin]:
+        return decode_markets(
+            await (
+                await client.markets(
+                    ids=list(ids),
+                    per_page=per_page,
+                    page=1,
+                )
+            ).read()
+        )
+
+    async with asyncio.TaskGroup() as fetch_tasks:
+        coins_market_batches = [
+            fetch_tasks.create_task(
+                fetch_market_coins(hot_coins_ids[index : index + per_page])
+            )
+            for index in range(0, len(hot_coins_ids), per_page)
+        ]
+
+    coins_market = [
+        coin_market
+        for coins_market_batch in coins_market_batches
+        for coin_market in coins_market_batch.result()
+    ]
+    now = sqlite_now()
+
+    coins_written = await market_coins_controller.upsert_many(
+        [coin_market.to_row(now) for coin_market in coins_market]
+    )
+
+    if market_snapshots.current is None:
+        await get_market_snapshot(session)
 
-    await client.session.close()
     await session.close()
-    return None
+
+    market_snapshot = market_snapshots.publish(
+        (
+            MarketCoin(
+                id=coin_market.id,
+                symbol=coin_market.symbol,
+                current_price=coin_market.current_price or 0.00,
+                market_cap=int(coin_market.market_cap or 0),
+            )
+            for coin_market in coins_market
+        ),
+        merge=True,
+    )
+
+    hot_history_interval = Config.hot_history_interval.to_int()
+
+    if hot_history_interval > 0 and (
+        price_history.updated_at is None
+        or market_snapshot.created_at - price_history.updated_at
+        >= datetime.timedelta(seconds=hot_history_interval)
+    ):
+        try:
+            await asyncio.to_thread(
+                price_history.append,
+                market_snapshot.created_at,
+                [coin_market.id for coin_market in coins_market],
+                (coin_market.current_price for coin_market in coins_market),
+                (coin_market.market_cap for coin_market in coins_market),
+                partial=True,
+            )
+
+        except Exception as e:
+            logger.error(f"Price history append failed: {e.__repr__()}")
+
+    events.bus.publish(events.MARKET_SNAPSHOT, market_snapshot.version)
+
+    return {
+        "batches": len(coins_market_batches),
+        "coins": len(coins_market),
+        "written": coins_written,
+        "version": market_snapshot.version,
+    }
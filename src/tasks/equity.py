@@ -0,0 +1,62 @@
+import datetime
+
+from core import equity
+from core.data import Config
+from core.database import async_session
+from models.controllers.equity import EquityController
+
+
+async def rollup_equity() -> dict:
+    session = async_session()
+    equity_controller = EquityController(session)
+
+    now = datetime.datetime.now()
+    retention = {
+        "1m": Config.equity_retention_1m.to_int(),
+        "1h": Config.equity_retention_1h.to_int(),
+        "1d": Config.equity_retention_1d.to_int(),
+    }
+    candles_written = {}
+    candles_deleted = {}
+
+    async with equity_controller.transaction():
+        for interval, source in equity.SOURCES.items():
+            since = await equity_controller.get_last_candle_at(interval)
+
+            if source is None:
+                candles = await equity_controller.get_points(since=since)
+
+            else:
+                candles = await equity_controller.get_candles(
+                    source,
+                    since=since,
+                )
+
+            candles_written[interval] = await equity_controller.upsert_candles(
+                equity.rollup(candles, interval)
+            )
+
+        points_deleted = await equity_controller.delete_points(
+            before=(
+                now
+                - datetime.timedelta(
+                    hours=Config.equity_retention_raw.to_int(),
+                )
+            ),
+        )
+
+        for interval, hours in retention.items():
+            if hours <= 0:
+                continue
+
+            candles_deleted[interval] = await equity_controller.delete_candles(
+                interval,
+                before=(now - datetime.timedelta(hours=hours)),
+            )
+
+    await session.close()
+
+    return {
+        "written": candles_written,
+        "deleted": candles_deleted | {"raw": points_deleted},
+    }
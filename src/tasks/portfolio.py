@@ -1,206 +1,234 @@
+import datetime
+
+import numpy as np
+from loguru import logger
+
+from core import events, revaluation
 from core.data import Config
+from core.equity import equity_sampler
 from core.database import async_session
+from core.leaderboard import leaderboard
+from core.report import Report, get_targets, reports
+from core.snapshot import MarketCoin, hot_coins, market_snapshots
+from models.controllers.equity import EquityController
 from models.controllers.market import MarketCoinsController
 from models.controllers.portfolio import PortfolioController
+from tasks.coins import get_market_snapshot
 
 
-async def update_stats() -> None:
+async def update_stats() -> dict:
     session = async_session()
-    market_coins_controller = MarketCoinsController(session)
     portfolio_controller = PortfolioController(session)
+    equity_controller = EquityController(session)
 
-    portfolios = await portfolio_controller.get_all()
-
-    for portfolio in portfolios:
-        portfolio_quote_value = 0.00
+    portfolios = await portfolio_controller.get_all(coins=False)
+    holdings_rows = await portfolio_controller.get_coins_holdings()
+    holdings_coin_ids = market_snapshots.pin(
+        holding.coin_id for holding in holdings_rows
+    )
+    market_snapshot = await get_market_snapshot(session)
 
-        for portfolio_coin in portfolio.coins:
-            market_coin = await market_coins_controller.get_by_id(
-                portfolio_coin.coin_id
-            )
+    if missing_coin_ids := holdings_coin_ids - market_snapshot.coins.keys():
+        market_snapshot = market_snapshots.publish(
+            (
+                MarketCoin.from_row(market_coin)
+                for market_coin in await MarketCoinsController(
+                    session
+                ).get_quotes(list(missing_coin_ids))
+            ),
+            merge=True,
+        )
 
-            if market_coin is None:
-                continue
+    if unpriced_coin_ids := holdings_coin_ids - market_snapshot.coins.keys():
+        logger.warning(
+            f"{len(unpriced_coin_ids)} held coins have no market price and"
+            f" are left out of revaluation: {sorted(unpriced_coin_ids)[:10]}"
+        )
 
-            portfolio_coin_quote_value = (
-                portfolio_coin.quantity * market_coin.current_price
-            )
-            portfolio_coin_quote_value_ath = (
-                portfolio_coin_quote_value
-                if portfolio_coin_quote_value > portfolio_coin.quote_value_ath
-                else portfolio_coin.quote_value_ath
-            )
-            portfolio_coin_quote_value_atl = (
-                portfolio_coin_quote_value
-                if portfolio_coin_quote_value < portfolio_coin.quote_value_atl
-                else portfolio_coin.quote_value_atl
-            )
-            portfolio_coin_pnl_percentage = max(
-                (
-                    (
-                        (
-                            portfolio_coin_quote_value
-                            - portfolio_coin.quote_value_invested
-                        )
-                        / portfolio_coin.quote_value_invested
-                    )
-                    * 100
+    holdings = revaluation.Holdings.from_rows(
+        holdings_rows,
+        market_snapshot.prices,
+    )
+    holdings_stats = revaluation.revalue_holdings(holdings)
+
+    portfolios_index = {
+        portfolio.id: index for index, portfolio in enumerate(portfolios)
+    }
+    holdings_portfolio_index = np.fromiter(
+        (
+            portfolios_index[portfolio_id]
+            for portfolio_id in holdings.portfolio_id
+        ),
+        dtype=np.intp,
+        count=len(holdings),
+    )
+    portfolios_previous = {
+        name: revaluation.column(portfolios, name)
+        for name in (*revaluation.REVALUED_COLUMNS, "quote_value_invested")
+    }
+    portfolios_stats = revaluation.revalue(
+        quote_value=np.bincount(
+            holdings_portfolio_index,
+            weights=holdings_stats["quote_value"],
+            minlength=len(portfolios),
+        ),
+        quote_value_invested=portfolios_previous["quote_value_invested"],
+        quote_value_ath=portfolios_previous["quote_value_ath"],
+        quote_value_atl=portfolios_previous["quote_value_atl"],
+        pnl_percentage_ath=portfolios_previous["pnl_percentage_ath"],
+        pnl_percentage_atl=portfolios_previous["pnl_percentage_atl"],
+        pnl_quote_value_ath=portfolios_previous["pnl_quote_value_ath"],
+        pnl_quote_value_atl=portfolios_previous["pnl_quote_value_atl"],
+    )
+
+    leaderboard.update(
+        holdings,
+        holdings_stats,
+        version=market_snapshot.version,
+    )
+    targets_portfolio_ids = {
+        target.portfolio_id
+        for target in get_targets()
+        if target.portfolio_id in portfolios_index
+    }
+    hot_coins.update(
+        coin.coin_id
+        for portfolio_id in targets_portfolio_ids
+        for coin in (
+            *leaderboard.gainers(portfolio_id, limit=hot_coins.max_coins),
+            *leaderboard.losers(portfolio_id, limit=hot_coins.max_coins),
+        )
+    )
+
+    holdings_portfolio_coins = np.bincount(
+        holdings_portfolio_index,
+        minlength=len(portfolios),
+    )
+    reports.publish(
+        (
+            Report.from_stats(
+                version=market_snapshot.version,
+                portfolio_id=portfolio_id,
+                portfolio_stats={
+                    name: float(values[portfolios_index[portfolio_id]])
+                    for name, values in (
+                        portfolios_previous | portfolios_stats
+                    ).items()
+                },
+                coins=int(
+                    holdings_portfolio_coins[portfolios_index[portfolio_id]]
                 ),
-                -99.9999,
-            )
-            portfolio_coin_pnl_percentage_ath = (
-                portfolio_coin_pnl_percentage
-                if portfolio_coin_pnl_percentage
-                > portfolio_coin.pnl_percentage_ath
-                else portfolio_coin.pnl_percentage_ath
-            )
-            portfolio_coin_pnl_percentage_atl = (
-                portfolio_coin_pnl_percentage
-                if portfolio_coin_pnl_percentage
-                < portfolio_coin.pnl_percentage_atl
-                else portfolio_coin.pnl_percentage_atl
-            )
-            portfolio_coin_pnl_quote_value = (
-                portfolio_coin_quote_value
-                - portfolio_coin.quote_value_invested
+                gainers=leaderboard.gainers(portfolio_id, limit=reports.coins),
+                losers=leaderboard.losers(portfolio_id, limit=reports.coins),
+                market_snapshot=market_snapshot,
             )
-            portfolio_coin_pnl_quote_value_ath = (
-                portfolio_coin_pnl_quote_value
-                if portfolio_coin_pnl_quote_value
-                > portfolio_coin.pnl_quote_value_ath
-                else portfolio_coin.pnl_quote_value_ath
-            )
-            portfolio_coin_pnl_quote_value_atl = (
-                portfolio_coin_pnl_quote_value
-                if portfolio_coin_pnl_quote_value
-                < portfolio_coin.pnl_quote_value_atl
-                else portfolio_coin.pnl_quote_value_atl
-            )
-
-            portfolio_quote_value += portfolio_coin_quote_value
-
-            await portfolio_controller.update_coin(
-                id=portfolio_coin.id,
-                quote_value=portfolio_coin_quote_value,
-                quote_value_ath=portfolio_coin_quote_value_ath,
-                quote_value_atl=portfolio_coin_quote_value_atl,
-                pnl_percentage=portfolio_coin_pnl_percentage,
-                pnl_percentage_ath=portfolio_coin_pnl_percentage_ath,
-                pnl_percentage_atl=portfolio_coin_pnl_percentage_atl,
-                pnl_quote_value=portfolio_coin_pnl_quote_value,
-                pnl_quote_value_ath=portfolio_coin_pnl_quote_value_ath,
-                pnl_quote_value_atl=portfolio_coin_pnl_quote_value_atl,
+            for portfolio_id in targets_portfolio_ids
+        ),
+        version=market_snapshot.version,
+    )
+
+    holdings_changed = revaluation.changed(
+        holdings.previous(),
+        holdings_stats,
+    )
+    portfolios_changed = revaluation.changed(
+        portfolios_previous,
+        portfolios_stats,
+    )
+
+    portfolios_coins: dict[str, list[dict]] = {
+        portfolio.id: [] for portfolio in portfolios
+    }
+    for portfolio_id, portfolio_coin in zip(
+        holdings.portfolio_id[holdings_changed],
+        revaluation.to_rows(
+            holdings.id[holdings_changed],
+            revaluation.select(holdings_stats, holdings_changed),
+        ),
+    ):
+        portfolios_coins[portfolio_id].append(portfolio_coin)
+
+    created_at = datetime.datetime.now()
+
+    async with portfolio_controller.transaction():
+        for portfolio_id, portfolio_coins in portfolios_coins.items():
+            await portfolio_controller.update_coins(
+                portfolio_id=portfolio_id,
+                coins=portfolio_coins,
             )
 
-        portfolio_quote_value_ath = (
-            portfolio_quote_value
-            if portfolio_quote_value > portfolio.quote_value_ath
-            else portfolio.quote_value_ath
-        )
-        portfolio_quote_value_atl = (
-            portfolio_quote_value
-            if portfolio_quote_value < portfolio.quote_value_atl
-            else portfolio.quote_value_atl
-        )
-        portfolio_pnl_percentage = max(
-            (
-                (
-                    (portfolio_quote_value - portfolio.quote_value_invested)
-                    / portfolio.quote_value_invested
+        for portfolio_stats in revaluation.to_rows(
+            np.asarray(
+                [portfolio.id for portfolio in portfolios], dtype=object
+            )[portfolios_changed],
+            revaluation.select(portfolios_stats, portfolios_changed),
+        ):
+            await portfolio_controller.update(**portfolio_stats)
+
+        equity_points = await equity_controller.create_points(
+            [
+                {
+                    "portfolio_id": portfolio.id,
+                    "quote_value": quote_value,
+                    "quote_value_invested": quote_value_invested,
+                    "created_at": created_at,
+                }
+                for portfolio, quote_value, quote_value_invested in zip(
+                    portfolios,
+                    portfolios_stats["quote_value"].tolist(),
+                    portfolios_previous["quote_value_invested"].tolist(),
                 )
-                * 100
-            ),
-            -99.9999,
-        )
-        portfolio_pnl_percentage_ath = (
-            portfolio_pnl_percentage
-            if portfolio_pnl_percentage > portfolio.pnl_percentage_ath
-            else portfolio.pnl_percentage_ath
-        )
-        portfolio_pnl_percentage_atl = (
-            portfolio_pnl_percentage
-            if portfolio_pnl_percentage < portfolio.pnl_percentage_atl
-            else portfolio.pnl_percentage_atl
-        )
-        portfolio_pnl_quote_value = (
-            portfolio_quote_value - portfolio.quote_value_invested
-        )
-        portfolio_pnl_quote_value_ath = (
-            portfolio_pnl_quote_value
-            if portfolio_pnl_quote_value > portfolio.pnl_quote_value_ath
-            else portfolio.pnl_quote_value_ath
-        )
-        portfolio_pnl_quote_value_atl = (
-            portfolio_pnl_quote_value
-            if portfolio_pnl_quote_value < portfolio.pnl_quote_value_atl
-            else portfolio.pnl_quote_value_atl
+            ]
+            if equity_sampler.due(created_at)
+            else []
         )
 
-        await portfolio_controller.update(
-            id=portfolio.id,
-            quote_value=portfolio_quote_value,
-            quote_value_ath=portfolio_quote_value_ath,
-            quote_value_atl=portfolio_quote_value_atl,
-            pnl_percentage=portfolio_pnl_percentage,
-            pnl_percentage_ath=portfolio_pnl_percentage_ath,
-            pnl_percentage_atl=portfolio_pnl_percentage_atl,
-            pnl_quote_value=portfolio_pnl_quote_value,
-            pnl_quote_value_ath=portfolio_pnl_quote_value_ath,
-            pnl_quote_value_atl=portfolio_pnl_quote_value_atl,
-        )
+    if equity_points > 0:
+        equity_sampler.mark(created_at)
 
     await session.close()
 
-    return None
+    events.bus.publish(events.PORTFOLIO_REVALUED, market_snapshot.version)
+
+    holdings_written = int(holdings_changed.sum())
+
+    return {
+        "holdings": len(holdings),
+        "written": holdings_written,
+        "unchanged": len(holdings) - holdings_written,
+        "unpriced": len(unpriced_coin_ids),
+        "hot": len(hot_coins),
+        "equity": equity_points,
+        "version": market_snapshot.version,
+    }
 
 
-async def add_new_coins() -> None:
+async def add_new_coins() -> dict:
     session = async_session()
-    market_coins_controller = MarketCoinsController(session)
     portfolio_controller = PortfolioController(session)
 
-    portfolios = await portfolio_controller.get_all()
-    market_coins = await market_coins_controller.get_all()
-    market_coins_ids = [market_coin.id for market_coin in market_coins]
-
-    for portfolio in portfolios:
-        portfolio_quote_value = portfolio.quote_value
-        portfolio_quote_value_invested = portfolio.quote_value_invested
-        porfolio_coins_ids = [
-            portfolio_coin.coin_id for portfolio_coin in portfolio.coins
-        ]
-
-        for market_coins_id in market_coins_ids:
-            if market_coins_id not in porfolio_coins_ids:
-                market_coin = await market_coins_controller.get_by_id(
-                    market_coins_id,
-                )
+    async with portfolio_controller.transaction():
+        portfolio_coins = await portfolio_controller.create_missing_coins(
+            quote_value=Config.buy_amount.to_float(),
+        )
 
-                if market_coin is None:
-                    continue
+        portfolios_quote_value: dict[str, float] = {}
+        for portfolio_coin in portfolio_coins:
+            portfolios_quote_value[portfolio_coin.portfolio_id] = (
+                portfolios_quote_value.get(portfolio_coin.portfolio_id, 0.00)
+                + portfolio_coin.quote_value
+            )
 
-                market_coin_quantity = (
-                    Config.buy_amount.to_float() / market_coin.current_price
-                )
-                market_coin_quote_value = (
-                    market_coin_quantity * market_coin.current_price
-                )
+        await portfolio_controller.add_quote_value(portfolios_quote_value)
 
-                await portfolio_controller.create_coin(
-                    portfolio_id=portfolio.id,
-                    coin_id=market_coin.id,
-                    quantity=market_coin_quantity,
-                    quote_value=market_coin_quote_value,
-                )
+    market_snapshot = await get_market_snapshot(session)
 
-                portfolio_quote_value += market_coin_quote_value
-                portfolio_quote_value_invested += market_coin_quote_value
+    await session.close()
 
-        await portfolio_controller.update(
-            id=portfolio.id,
-            quote_value=portfolio_quote_value,
-            quote_value_invested=portfolio_quote_value_invested,
-        )
+    events.bus.publish(events.MARKET_SNAPSHOT, market_snapshot.version)
 
-    await session.close()
-    return None
+    return {
+        "added": len(portfolio_coins),
+        "portfolios": len(portfolios_quote_value),
+        "version": market_snapshot.version,
+    }
@@ -1,99 +1,164 @@
+import asyncio
+
+import numpy as np
 from loguru import logger
 
-from core.data import Config, Telegram
-from core.database import async_session
-from core.telegram import bot, md
-from models.controllers.market import MarketCoinsController
-from models.controllers.portfolio import PortfolioController
+from core.analytics import PortfolioAnalytics
+from core.report import Channel, Report, get_targets, reports
+from core.telegram import Edit, bot, edit_queue, md
+from tasks.analytics import get_portfolio_analytics
 from utils.aiogram import InlineKeyboards
 
 
-async def update_channel_message() -> None:
-    session = async_session()
-    market_coins_controller = MarketCoinsController(session)
-    portfolio_controller = PortfolioController(session)
-
-    telegram_channel = await bot.get_chat(
-        chat_id=Telegram.channel_id.to_string(),
-    )
-    telegram_channel_post_url = "https://t.me/{username}/{message_id}".format(
+async def load_channel(chat_id: int) -> Channel:
+    telegram_channel = await bot.get_chat(chat_id=chat_id)
+    reports.channels[chat_id] = Channel(
+        id=chat_id,
         username=telegram_channel.username,
-        message_id=Telegram.channel_message_id.to_string(),
     )
 
-    portfolio = await portfolio_controller.get_by_id(
-        Config.portfolio_id.to_string(),
-    )
-    portfolio_coin_gainers = await portfolio_controller.get_coin_gainers(
-        portfolio_id=portfolio.id,
-        limit=5,
+    return reports.channels[chat_id]
+
+
+async def load_channels() -> list[Channel]:
+    return await asyncio.gather(
+        *(
+            load_channel(chat_id)
+            for chat_id in {target.chat_id for target in get_targets()}
+        )
     )
-    portfolio_coin_losers = await portfolio_controller.get_coin_losers(
-        portfolio_id=portfolio.id,
-        limit=5,
+
+
+def format_metric(value: float, template: str = "{:.2f}") -> str:
+    return template.format(value) if np.isfinite(value) else "n/a"
+
+
+def render_analytics_text(portfolio_analytics: PortfolioAnalytics) -> str:
+    if not np.isfinite(portfolio_analytics.sharpe):
+        return ""
+
+    return (
+        f"Risk ({portfolio_analytics.interval}):\n"
+        "\tMax drawdown "
+        f"{format_metric(portfolio_analytics.max_drawdown * 100, '{:.2f}%')}\n"
+        "\tVolatility "
+        f"{format_metric(portfolio_analytics.volatility * 100, '{:.2f}%')}\n"
+        f"\tSharpe {format_metric(portfolio_analytics.sharpe)}"
+        f" Sortino {format_metric(portfolio_analytics.sortino)}"
+        f" Beta {format_metric(portfolio_analytics.beta)}\n\n"
     )
 
+
+def render_message_text(
+    report: Report,
+    portfolio_analytics: PortfolioAnalytics | None = None,
+) -> str:
     coin_message_template = (
         "\t${symbol} {quote_value:,.2f}$ ({quote_value_pnl:+,.2f}$)"
     )
     gainers_message_text = "\n".join(
         [
             coin_message_template.format(
-                symbol=(
-                    await market_coins_controller.get_by_id(coin.coin_id)
-                ).symbol.upper(),
+                symbol=coin.symbol.upper(),
                 quote_value=coin.quote_value,
                 quote_value_pnl=(coin.quote_value - coin.quote_value_invested),
             )
-            for coin in portfolio_coin_gainers
+            for coin in report.gainers
         ]
     )
     losers_message_text = "\n".join(
         [
             coin_message_template.format(
-                symbol=(
-                    await market_coins_controller.get_by_id(coin.coin_id)
-                ).symbol.upper(),
+                symbol=coin.symbol.upper(),
                 quote_value=coin.quote_value,
                 quote_value_pnl=(coin.quote_value - coin.quote_value_invested),
             )
-            for coin in portfolio_coin_losers
+            for coin in report.losers
         ]
     )
-    message_text = md.hcode(
-        f"Balance: {portfolio.quote_value:,.2f}$ ({portfolio.pnl_percentage:+.2f}%)\n\n"
-        f"Top {len(portfolio_coin_gainers)} gainers:\n"
+
+    return md.hcode(
+        f"Balance: {report.quote_value:,.2f}$ ({report.pnl_percentage:+.2f}%)\n\n"
+        f"Top {len(report.gainers)} gainers:\n"
         f"{gainers_message_text}\n\n"
-        f"Top {len(portfolio_coin_losers)} losers:\n"
+        f"Top {len(report.losers)} losers:\n"
         f"{losers_message_text}\n\n"
         f"Total:\n"
-        f"\tInvested {portfolio.quote_value_invested:,.2f}$\n"
-        f"\tTokens {len(portfolio.coins)}\n"
-        f"\tATH profit {portfolio.pnl_quote_value_ath:+,.2f}$ ({portfolio.pnl_percentage_ath:+,.2f}%)\n"
-        f"\tATL profit {portfolio.pnl_quote_value_atl:+,.2f}$ ({portfolio.pnl_percentage_atl:+,.2f}%)\n\n"
-    )
-    message_keyboard = InlineKeyboards.build_keyboard(
-        buttons=[
-            [
-                InlineKeyboards.build_button(
-                    text="About the experiment",
-                    url=telegram_channel_post_url,
-                ),
-            ],
-        ],
+        f"\tInvested {report.quote_value_invested:,.2f}$\n"
+        f"\tTokens {report.coins}\n"
+        f"\tATH profit {report.pnl_quote_value_ath:+,.2f}$ ({report.pnl_percentage_ath:+,.2f}%)\n"
+        f"\tATL profit {report.pnl_quote_value_atl:+,.2f}$ ({report.pnl_percentage_atl:+,.2f}%)\n\n"
+        + (
+            render_analytics_text(portfolio_analytics)
+            if portfolio_analytics is not None
+            else ""
+        )
     )
 
-    await session.close()
 
-    try:
-        await bot.edit_message_text(
-            text=message_text,
-            chat_id=Telegram.channel_id.to_int(),
-            message_id=Telegram.channel_message_id.to_int(),
-            reply_markup=message_keyboard,
+async def update_channel_message() -> dict:
+    messages_text: dict[str, str] = {}
+    queued = 0
+
+    for target in get_targets():
+        report = reports.get(target.portfolio_id)
+
+        if report is None:
+            continue
+
+        if target.portfolio_id not in messages_text:
+            try:
+                portfolio_analytics = await get_portfolio_analytics(
+                    target.portfolio_id
+                )
+
+            except Exception as e:
+                logger.error(
+                    f"Analytics for portfolio {target.portfolio_id}"
+                    f" failed: {e.__repr__()}"
+                )
+                portfolio_analytics = None
+
+            messages_text[target.portfolio_id] = render_message_text(
+                report,
+                portfolio_analytics,
+            )
+
+        channel = reports.channels.get(target.chat_id)
+
+        if channel is None:
+            try:
+                channel = await load_channel(target.chat_id)
+
+            except Exception as e:
+                logger.error(
+                    f"Telegram channel {target.chat_id} for portfolio"
+                    f" {target.portfolio_id} is unavailable: {e.__repr__()}"
+                )
+                continue
+
+        message_keyboard = InlineKeyboards.build_keyboard(
+            buttons=[
+                [
+                    InlineKeyboards.build_button(
+                        text="About the experiment",
+                        url=channel.post_url(target.message_id),
+                    ),
+                ],
+            ],
+        )
+
+        queued += edit_queue.submit(
+            Edit(
+                chat_id=target.chat_id,
+                message_id=target.message_id,
+                text=messages_text[target.portfolio_id],
+                reply_markup=message_keyboard,
+            )
         )
-    except Exception as e:
-        logger.error(e.__repr__())
-        pass
 
-    return None
+    return {
+        "version": reports.version,
+        "targets": len(get_targets()),
+        "queued": queued,
+    } | edit_queue.stats()
@@ -0,0 +1,141 @@
+import asyncio
+import math
+import random
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+SKIP = "skip"
+COALESCE = "coalesce"
+
+
+class Interval:
+    def __init__(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        seconds: float,
+        jitter: float = 0.00,
+        overlap: str = SKIP,
+        start: bool = True,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> None:
+        if seconds <= 0:
+            raise ValueError(f"Interval must be positive, got {seconds}")
+
+        if overlap not in (SKIP, COALESCE):
+            raise ValueError(f"Unknown overlap policy: {overlap}")
+
+        self.func = func
+        self.name = func.__name__
+        self.seconds = seconds
+        self.jitter = max(jitter, 0.00)
+        self.overlap = overlap
+        self.loop = loop or asyncio.get_event_loop()
+
+        self.started_at: float | None = None
+        self.tick = 0
+        self.runs = 0
+        self.skipped = 0
+        self.coalesced = 0
+
+        self._handle: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+        self._pending = False
+
+        if start:
+            self.start()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.started_at is not None:
+            return None
+
+        self.started_at = self.loop.time()
+        self.tick = 0
+        self._schedule()
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        if self._task is not None:
+            self._task.cancel()
+
+        self._pending = False
+        self.started_at = None
+
+    def _schedule(self) -> None:
+        elapsed = self.loop.time() - self.started_at
+        tick = max(self.tick + 1, math.floor(elapsed / self.seconds) + 1)
+
+        if tick > self.tick + 1:
+            missed = tick - self.tick - 1
+            self.skipped += missed
+            logger.warning(
+                f"Interval '{self.name}' fell behind, skipped {missed} ticks"
+            )
+
+        self.tick = tick
+        self._handle = self.loop.call_at(
+            self.started_at
+            + self.tick * self.seconds
+            + random.uniform(0.00, self.jitter),
+            self._fire,
+        )
+
+    def _fire(self) -> None:
+        self._schedule()
+
+        if not self.running:
+            self._run()
+            return None
+
+        if self.overlap == COALESCE:
+            self.coalesced += 1
+            self._pending = True
+            return None
+
+        self.skipped += 1
+        logger.warning(
+            f"Interval '{self.name}' is still running, tick {self.tick} skipped"
+        )
+
+    def _run(self) -> None:
+        self.runs += 1
+        self._task = self.loop.create_task(self.func())
+        self._task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                f"Interval '{self.name}' raised an exception:"
+                f" {task.exception().__repr__()}"
+            )
+
+        if self._pending and self.started_at is not None:
+            self._pending = False
+            self._run()
+
+
+def interval(
+    seconds: float,
+    jitter: float = 0.00,
+    overlap: str = SKIP,
+    start: bool = True,
+    loop: asyncio.AbstractEventLoop | None = None,
+) -> Callable[[Callable[[], Awaitable[Any]]], Interval]:
+    def decorator(func: Callable[[], Awaitable[Any]]) -> Interval:
+        return Interval(
+            func=func,
+            seconds=seconds,
+            jitter=jitter,
+            overlap=overlap,
+            start=start,
+            loop=loop,
+        )
+
+    return decorator
@@ -11,9 +11,10 @@ def log(func, time_precision: int = 2) -> None:
         logger.info(f"Called task '{task_name}'")
 
         start_time = time.time()
+        stats = None
 
         try:
-            await func(*args, **kwargs)
+            stats = await func(*args, **kwargs)
 
         except Exception as e:
             logger.error(
@@ -25,6 +26,7 @@ def log(func, time_precision: int = 2) -> None:
         logger.info(
             f"Task '{task_name}' done,"
             f" time: {end_time:.{time_precision}f} secs"
+            + (f", stats: {stats}" if stats is not None else "")
         )
 
     return wrapper